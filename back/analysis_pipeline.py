@@ -0,0 +1,88 @@
+import os
+import json
+import math
+import asyncio
+from transcript_codec import transcript_for_prompt
+
+# Estimativa de tokens sem tokenizer: ~3.5 caracteres por token (conservador para português)
+CHARS_PER_TOKEN = 3.5
+# Acima desse tamanho estimado, o prompt de análise é processado em map-reduce
+ANALYSIS_MAX_PROMPT_TOKENS = int(os.getenv("ANALYSIS_MAX_PROMPT_TOKENS", "30000"))
+# Tamanho estimado de cada trecho da transcrição na etapa de map
+ANALYSIS_SEGMENT_TOKENS = int(os.getenv("ANALYSIS_SEGMENT_TOKENS", "8000"))
+# Trechos resumidos em paralelo
+ANALYSIS_MAP_CONCURRENCY = int(os.getenv("ANALYSIS_MAP_CONCURRENCY", "4"))
+
+with open("prompts/prompt_segmento.txt", "r") as f:
+    segment_prompt_template = f.read()
+
+with open("prompts/prompt_consolidacao.txt", "r") as f:
+    reduce_prompt_preamble = f.read()
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_transcript(utterances: list, max_tokens: int = None) -> list:
+    """Divide as falas em trechos consecutivos de até ~max_tokens cada (uma fala nunca é quebrada)"""
+    if max_tokens is None:
+        max_tokens = ANALYSIS_SEGMENT_TOKENS
+    segments = []
+    current = []
+    current_tokens = 0
+    for utt in utterances:
+        utt_tokens = estimate_tokens(f"{utt.get('speaker')}: {utt.get('text') or ''}\n")
+        if current and current_tokens + utt_tokens > max_tokens:
+            segments.append(current)
+            current = []
+            current_tokens = 0
+        current.append(utt)
+        current_tokens += utt_tokens
+    if current:
+        segments.append(current)
+    return segments
+
+
+async def summarize_segments(client, model: str, position_data: dict, segments: list) -> list:
+    """Etapa de map: extrai anotações de cada trecho em paralelo (até ANALYSIS_MAP_CONCURRENCY por vez)"""
+    semaphore = asyncio.Semaphore(ANALYSIS_MAP_CONCURRENCY)
+
+    async def summarize(index: int, segment: list) -> dict:
+        segment_json = json.dumps({
+            "position_data": position_data,
+            "segment": {"index": index + 1, "total": len(segments)},
+            "transcript": transcript_for_prompt(segment)
+        }, ensure_ascii=False)
+        async with semaphore:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": segment_prompt_template + segment_json}],
+                response_format={ "type": "json_object" },
+                temperature=0.3,
+                max_tokens=1200
+            )
+        notes = json.loads(response.choices[0].message.content)
+        notes["segment"] = index + 1
+        notes["start"] = segment[0].get("start")
+        notes["end"] = segment[-1].get("end")
+        print(f"[ANALYSIS] 🧩 Trecho {index + 1}/{len(segments)} resumido ({len(segment)} falas)")
+        return notes
+
+    return await asyncio.gather(*[summarize(i, segment) for i, segment in enumerate(segments)])
+
+
+async def build_reduce_prompt(client, model: str, prompt_template: str, interview_info: dict, utterances: list) -> str:
+    """Map-reduce: resume os trechos e monta o prompt final com as anotações no lugar da transcrição"""
+    segments = split_transcript(utterances)
+    print(f"[ANALYSIS] ✂️  Transcrição dividida em {len(segments)} trecho(s) de até ~{ANALYSIS_SEGMENT_TOKENS} tokens")
+    segment_notes = await summarize_segments(client, model, interview_info["position_data"], segments)
+
+    reduce_info = {
+        "position_data": interview_info["position_data"],
+        "segment_notes": segment_notes,
+        "notes": interview_info["notes"]
+    }
+    prompt = reduce_prompt_preamble + prompt_template + json.dumps(reduce_info, ensure_ascii=False)
+    print(f"[ANALYSIS] 🧮 Prompt consolidado: ~{estimate_tokens(prompt)} tokens")
+    return prompt
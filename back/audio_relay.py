@@ -0,0 +1,160 @@
+import os
+import time
+import asyncio
+
+# Quantos frames do navegador podem ficar na fila de cada consumidor
+AUDIO_RELAY_QUEUE_FRAMES = int(os.getenv("AUDIO_RELAY_QUEUE_FRAMES", "200"))
+# Janela de agrupamento dos frames enviados ao AssemblyAI (0 desativa)
+AUDIO_RELAY_BATCH_MS = int(os.getenv("AUDIO_RELAY_BATCH_MS", "100"))
+
+
+class AudioRelayDiskError(Exception):
+    """A gravação do áudio em disco falhou; a sessão não deve continuar recebendo frames"""
+
+
+class AudioRelay:
+    """Repasse do áudio do navegador para o disco e para o AssemblyAI, com filas separadas.
+
+    - O disco recebe todos os frames: se a fila encher, `put()` espera (backpressure).
+      Se a gravação falhar, `put()` passa a lançar AudioRelayDiskError.
+    - O AssemblyAI recebe frames agrupados em blocos de ~AUDIO_RELAY_BATCH_MS; se o envio
+      atrasar e a fila encher, os frames mais antigos são descartados e contabilizados,
+      para a transcrição em tempo real não acumular atraso.
+    """
+
+    def __init__(self, writer, send_upstream=None, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2,
+                 batch_ms: int = None, max_frames: int = None):
+        if batch_ms is None:
+            batch_ms = AUDIO_RELAY_BATCH_MS
+        if max_frames is None:
+            max_frames = AUDIO_RELAY_QUEUE_FRAMES
+        self.writer = writer
+        self.send_upstream = send_upstream
+        self.batch_ms = batch_ms
+        self.batch_bytes = sample_rate * channels * sample_width * batch_ms // 1000
+        self._disk_queue = asyncio.Queue(maxsize=max_frames)
+        self._upstream_queue = asyncio.Queue(maxsize=max_frames)
+        self._tasks = []
+        self._closed = False
+        self.metrics = {
+            "frames_in": 0,
+            "bytes_in": 0,
+            "upstream_sends": 0,
+            "upstream_bytes": 0,
+            "upstream_dropped_frames": 0,
+            "upstream_dropped_bytes": 0,
+            "disk_queue_max": 0,
+            "upstream_queue_max": 0,
+            "upstream_error": None,
+            "disk_error": None,
+        }
+
+    def start(self):
+        self._tasks.append(asyncio.create_task(self._disk_writer()))
+        if self.send_upstream is not None:
+            self._tasks.append(asyncio.create_task(self._upstream_sender()))
+        return self
+
+    def _check_disk(self):
+        if self.metrics["disk_error"]:
+            raise AudioRelayDiskError(f"Erro ao gravar áudio em disco: {self.metrics['disk_error']}")
+
+    async def put(self, frame: bytes):
+        self._check_disk()
+        self.metrics["frames_in"] += 1
+        self.metrics["bytes_in"] += len(frame)
+
+        await self._disk_queue.put(frame)
+        # O gravador pode ter falhado enquanto esperávamos espaço na fila
+        self._check_disk()
+        self.metrics["disk_queue_max"] = max(self.metrics["disk_queue_max"], self._disk_queue.qsize())
+
+        if self.send_upstream is None or self.metrics["upstream_error"]:
+            return
+        if self._upstream_queue.full():
+            dropped = self._upstream_queue.get_nowait()
+            self.metrics["upstream_dropped_frames"] += 1
+            self.metrics["upstream_dropped_bytes"] += len(dropped)
+            if self.metrics["upstream_dropped_frames"] % 50 == 1:
+                print(f"[RELAY] ⚠️  Envio ao AssemblyAI atrasado - {self.metrics['upstream_dropped_frames']} frame(s) descartado(s)")
+        self._upstream_queue.put_nowait(frame)
+        self.metrics["upstream_queue_max"] = max(self.metrics["upstream_queue_max"], self._upstream_queue.qsize())
+
+    async def _disk_writer(self):
+        while True:
+            frame = await self._disk_queue.get()
+            if frame is None:
+                return
+            try:
+                await self.writer.write(frame)
+            except Exception as e:
+                self.metrics["disk_error"] = str(e) or type(e).__name__
+                print(f"[RELAY] ❌ Erro ao gravar áudio em disco - gravação interrompida: {e}")
+                # Esvazia a fila para liberar quem está esperando em put()/close()
+                while not self._disk_queue.empty():
+                    self._disk_queue.get_nowait()
+                return
+
+    async def _next_batch(self):
+        """Espera um frame e junta os que chegarem até completar a janela de agrupamento"""
+        frame = await self._upstream_queue.get()
+        if frame is None:
+            return None, True
+        batch = [frame]
+        size = len(frame)
+        deadline = time.monotonic() + self.batch_ms / 1000
+        while size < self.batch_bytes:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                frame = await asyncio.wait_for(self._upstream_queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if frame is None:
+                return b''.join(batch), True
+            batch.append(frame)
+            size += len(frame)
+        return b''.join(batch), False
+
+    async def _upstream_sender(self):
+        while True:
+            batch, finished = await self._next_batch()
+            if batch:
+                try:
+                    await self.send_upstream(batch)
+                except Exception as e:
+                    self.metrics["upstream_error"] = str(e)
+                    print(f"[RELAY] ❌ Erro ao enviar áudio ao AssemblyAI - envio interrompido: {e}")
+                    return
+                self.metrics["upstream_sends"] += 1
+                self.metrics["upstream_bytes"] += len(batch)
+            if finished:
+                return
+
+    async def close(self):
+        """Grava no disco todos os frames pendentes e encerra os consumidores"""
+        if self._closed:
+            return
+        self._closed = True
+        disk_task = self._tasks[0] if self._tasks else None
+        if disk_task is not None and not disk_task.done():
+            # Se o gravador falhar enquanto esperamos, ele esvazia a fila e este put retorna
+            await self._disk_queue.put(None)
+        if self.send_upstream is not None and not self.metrics["upstream_error"]:
+            if self._upstream_queue.full():
+                self._upstream_queue.get_nowait()
+            self._upstream_queue.put_nowait(None)
+        for task in self._tasks:
+            try:
+                # O disco é sempre esvaziado; o envio ao AssemblyAI tem um limite de espera
+                if task is self._tasks[0]:
+                    await task
+                else:
+                    await asyncio.wait_for(task, timeout=5)
+            except asyncio.TimeoutError:
+                print("[RELAY] ⚠️  Envio final ao AssemblyAI excedeu o tempo limite")
+            except Exception as e:
+                print(f"[RELAY] ⚠️  Consumidor encerrou com erro: {e}")
+        self._tasks.clear()
+        print(f"[RELAY] 📊 {self.metrics}")
@@ -0,0 +1,99 @@
+import json
+import uuid
+from datetime import datetime
+from database import db_connection
+
+# Um lote é só o registro de quais jobs 'analysis' foram enfileirados para um cargo.
+# Concorrência e taxa são aplicadas pelos workers de jobs (ver register_job_handler),
+# e o progresso é lido da tabela jobs, então o lote sobrevive a um restart do servidor.
+
+
+def create_batch(position_id: int, job_ids: dict, skipped: list, force: bool = False) -> str:
+    """Registra o lote com {interview_id: job_id} e retorna o id do lote"""
+    batch_id = uuid.uuid4().hex
+    with db_connection() as conn:
+        conn.execute(
+            "INSERT INTO analysis_batches (id, position_id, force, skipped, created_at) VALUES (?, ?, ?, ?, ?)",
+            (batch_id, position_id, int(force), json.dumps(skipped), datetime.now().isoformat())
+        )
+        conn.executemany(
+            "INSERT INTO analysis_batch_jobs (batch_id, interview_id, job_id) VALUES (?, ?, ?)",
+            [(batch_id, interview_id, job_id) for interview_id, job_id in job_ids.items()]
+        )
+        conn.commit()
+    print(f"[BATCH] 🚀 Lote {batch_id[:8]}: {len(job_ids)} entrevista(s) do cargo {position_id} enfileiradas "
+          f"({len(skipped)} já analisadas)")
+    return batch_id
+
+
+def _batch_to_dict(conn, batch) -> dict:
+    rows = conn.execute(
+        """
+        SELECT analysis_batch_jobs.interview_id, jobs.id AS job_id, jobs.status, jobs.last_error,
+               jobs.updated_at, interviews.score
+        FROM analysis_batch_jobs
+        JOIN jobs ON jobs.id = analysis_batch_jobs.job_id
+        LEFT JOIN interviews ON interviews.id = analysis_batch_jobs.interview_id
+        WHERE analysis_batch_jobs.batch_id = ?
+        ORDER BY analysis_batch_jobs.interview_id
+        """,
+        (batch["id"],)
+    ).fetchall()
+
+    counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    results = []
+    for row in rows:
+        counts[row["status"]] += 1
+        result = {"interview_id": row["interview_id"], "job_id": row["job_id"], "status": row["status"]}
+        if row["status"] == "done":
+            result["score"] = row["score"]
+        elif row["status"] == "failed":
+            result["error"] = row["last_error"]
+        results.append(result)
+
+    finished = counts["queued"] == 0 and counts["running"] == 0
+    if finished:
+        status = "done"
+    elif counts["queued"] == len(rows):
+        status = "queued"
+    else:
+        status = "running"
+    skipped = json.loads(batch["skipped"] or "[]")
+    return {
+        "batch_id": batch["id"],
+        "position_id": batch["position_id"],
+        "status": status,
+        "force": bool(batch["force"]),
+        "total": len(rows),
+        **counts,
+        "skipped": len(skipped),
+        "skipped_ids": skipped,
+        "results": results,
+        "created_at": batch["created_at"],
+        "finished_at": max((row["updated_at"] for row in rows), default=batch["created_at"]) if finished else None,
+    }
+
+
+def get_batch(batch_id: str):
+    with db_connection() as conn:
+        batch = conn.execute("SELECT * FROM analysis_batches WHERE id = ?", (batch_id,)).fetchone()
+        return _batch_to_dict(conn, batch) if batch else None
+
+
+def running_batch_for_position(position_id: int):
+    """Lote mais recente do cargo que ainda tem jobs na fila ou rodando"""
+    with db_connection() as conn:
+        batch = conn.execute(
+            """
+            SELECT * FROM analysis_batches
+            WHERE position_id = ? AND EXISTS (
+                SELECT 1 FROM analysis_batch_jobs
+                JOIN jobs ON jobs.id = analysis_batch_jobs.job_id
+                WHERE analysis_batch_jobs.batch_id = analysis_batches.id AND jobs.status IN ('queued', 'running')
+            )
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (position_id,)
+        ).fetchone()
+        return _batch_to_dict(conn, batch) if batch else None
@@ -12,6 +12,7 @@ import os
 import sys
 import argparse
 import shutil
+from interview_store import clear_search_index
 
 DATABASE = "./interviews.db"
 UPLOADS_DIR = "./uploads"
@@ -81,6 +82,9 @@ def clear_all_data(skip_backup=False):
     cursor.execute("DELETE FROM interviews")
     print("   ✅ Entrevistas deletadas")
     
+    clear_search_index(conn)
+    print("   ✅ Índice de busca limpo")
+    
     cursor.execute("DELETE FROM global_questions")
     print("   ✅ Perguntas globais deletadas")
     
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script para regravar transcrições e análises no formato de armazenamento atual.
+
+Linhas antigas (texto sem compressão) são comprimidas em lotes pequenos, cada um em
+sua própria transação, então pode rodar com o servidor no ar.
+
+Uso:
+    python compact_storage.py                  # Comprime tudo que ainda está como texto
+    python compact_storage.py --dry-run        # Apenas mostra quanto seria economizado
+    python compact_storage.py --format none    # Volta tudo para texto sem compressão
+    python compact_storage.py --vacuum         # Ao final, roda VACUUM para reduzir o arquivo
+"""
+
+import sqlite3
+import argparse
+import time
+import zlib
+from interview_store import BLOB_COMPRESSION, encode_stored, decode_stored
+
+DATABASE = "./interviews.db"
+
+# (tabela, coluna) com os valores grandes de cada entrevista
+STORED_COLUMNS = [
+    ("interview_transcripts", "transcript"),
+    ("interview_analyses", "analysis"),
+]
+
+
+def stored_size(value) -> int:
+    return len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+
+
+def compact_table(conn, table: str, column: str, fmt: str, batch_size: int, pause: float, dry_run: bool):
+    """Regrava os valores de `column` que não estão em `fmt`; retorna (linhas alteradas, bytes antes, bytes depois)"""
+    changed = 0
+    before = 0
+    after = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT interview_id, {column} FROM {table} WHERE interview_id > ? ORDER BY interview_id LIMIT ?",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1]["interview_id"]
+
+        updates = []
+        for row in rows:
+            value = row[column]
+            try:
+                new_value = encode_stored(decode_stored(value), fmt)
+            except (ValueError, zlib.error) as e:
+                print(f"  ⚠️  {table}: interview_id {row['interview_id']} ilegível ({e}) - mantido como está")
+                continue
+            # Já está no formato de destino (texto -> texto, BLOB -> BLOB)
+            if isinstance(value, (bytes, memoryview)) == isinstance(new_value, bytes):
+                continue
+            before += stored_size(value)
+            after += stored_size(new_value)
+            updates.append((new_value, row["interview_id"]))
+
+        if updates and not dry_run:
+            conn.executemany(f"UPDATE {table} SET {column} = ? WHERE interview_id = ?", updates)
+            conn.commit()
+        changed += len(updates)
+        print(f"  {table}: até interview_id {last_id} - {changed} linha(s) {'a regravar' if dry_run else 'regravada(s)'}")
+        if pause:
+            time.sleep(pause)
+    return changed, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprime (ou descomprime) transcrições e análises já salvas")
+    parser.add_argument("--format", choices=["zlib", "none"], default=BLOB_COMPRESSION, help="Formato de destino (padrão: BLOB_COMPRESSION)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Linhas por transação")
+    parser.add_argument("--pause", type=float, default=0.05, help="Pausa (s) entre lotes para não segurar o banco")
+    parser.add_argument("--dry-run", action="store_true", help="Não grava nada, apenas calcula a economia")
+    parser.add_argument("--vacuum", action="store_true", help="Roda VACUUM no final (bloqueia o banco enquanto executa)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DATABASE, timeout=30)
+    conn.row_factory = sqlite3.Row
+
+    print(f"\n{'='*80}")
+    print(f"COMPACTAÇÃO DO ARMAZENAMENTO - formato de destino: {args.format}{' (DRY-RUN)' if args.dry_run else ''}")
+    print(f"{'='*80}\n")
+
+    total_changed = 0
+    for table, column in STORED_COLUMNS:
+        changed, before, after = compact_table(
+            conn, table, column, args.format, args.batch_size, args.pause, args.dry_run
+        )
+        total_changed += changed
+        if changed:
+            print(f"📦 {table}.{column}: {changed} linha(s), {before / 1024:.1f} KB -> {after / 1024:.1f} KB"
+                  f" ({before / max(after, 1):.1f}x)")
+        else:
+            print(f"✅ {table}.{column}: nada a regravar")
+
+    if args.vacuum and not args.dry_run:
+        print(f"\n🧹 Executando VACUUM...")
+        conn.execute("VACUUM")
+
+    conn.close()
+    print(f"\n✅ {total_changed} valor(es) {'seriam regravados' if args.dry_run else 'regravados'}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,130 @@
 import sqlite3
 import os
+import queue
+from datetime import datetime
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from interview_store import rebuild_search_index
+
+load_dotenv()
 
 DATABASE = "./interviews.db"
 
+# Quantidade máxima de conexões ociosas mantidas no pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+# Tempo (ms) que uma escrita espera por um lock antes de falhar com "database is locked"
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-16000",  # ~16 MB por conexão
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}",
+]
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexão SQLite cujo close() devolve a conexão ao pool em vez de fechá-la"""
+
+    pool = None
+    checked_out = False
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def close_for_real(self):
+        super().close()
+
+
+class ConnectionPool:
+    """Pool thread-safe de conexões SQLite reutilizadas entre requisições"""
+
+    def __init__(self, database: str, size: int = DB_POOL_SIZE):
+        self.database = database
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.database,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn: PooledConnection):
+        # close() chamado mais de uma vez não pode devolver a mesma conexão duas vezes
+        if not conn.checked_out:
+            return
+        conn.checked_out = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close_for_real()
+
+    def close_all(self):
+        """Fecha as conexões ociosas (no shutdown), fazendo antes o checkpoint do WAL no arquivo principal"""
+        checkpointed = False
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if not checkpointed:
+                checkpointed = True
+                try:
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                except sqlite3.Error as e:
+                    print(f"[DB] ⚠️  Checkpoint do WAL falhou: {e}")
+            conn.close_for_real()
+
+
+pool = ConnectionPool(DATABASE)
+
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Retorna uma conexão do pool; conn.close() a devolve ao pool"""
+    return pool.acquire()
+
+
+@contextmanager
+def db_connection():
+    """Empresta uma conexão do pool e garante a devolução mesmo em caso de exceção"""
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+# Só o índice invertido (content=''): o texto já está em interviews e nas tabelas comprimidas
+SEARCH_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS interview_search USING fts5(
+        name, notes, transcript, analysis,
+        content = '',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
 
 def create_table():
     conn = get_db_connection()
@@ -22,12 +139,6 @@ def create_table():
             vacancies INTEGER DEFAULT 0
         )
     """)
-    
-    # Adicionar coluna vacancies se não existir (para tabelas antigas)
-    try:
-        cursor.execute("ALTER TABLE positions ADD COLUMN vacancies INTEGER DEFAULT 0")
-    except sqlite3.OperationalError:
-        pass  # Coluna já existe
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS interviews (
@@ -38,21 +149,48 @@ def create_table():
             audio_file TEXT,
             notes TEXT,
             date TEXT,
-            transcript TEXT,
-            analysis TEXT,
             score INTEGER,
             position_id INTEGER,
             duration REAL,
             FOREIGN KEY (position_id) REFERENCES positions(id)
         )
     """)
-    
-    # Adicionar coluna duration se não existir (para tabelas antigas)
-    try:
-        cursor.execute("ALTER TABLE interviews ADD COLUMN duration REAL")
-        print("[MIGRATION] ✅ Coluna 'duration' adicionada à tabela interviews")
-    except sqlite3.OperationalError:
-        pass  # Coluna já existe
+
+    # Transcrição e análise (JSONs grandes) ficam fora de interviews, 1:1 com a entrevista,
+    # para que listagens e contagens só leiam as páginas pequenas de metadados
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_transcripts (
+            interview_id INTEGER PRIMARY KEY,
+            transcript TEXT NOT NULL,
+            updated_at TEXT,
+            FOREIGN KEY (interview_id) REFERENCES interviews(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_analyses (
+            interview_id INTEGER PRIMARY KEY,
+            analysis TEXT NOT NULL,
+            updated_at TEXT,
+            FOREIGN KEY (interview_id) REFERENCES interviews(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_interviews_delete_blobs AFTER DELETE ON interviews
+        BEGIN
+            DELETE FROM interview_transcripts WHERE interview_id = OLD.id;
+            DELETE FROM interview_analyses WHERE interview_id = OLD.id;
+        END
+    """)
+
+    # Busca textual (FTS5), uma linha por entrevista com rowid = interviews.id; mantida por interview_store.index_interview
+    cursor.execute(SEARCH_TABLE_SQL)
+    # Valores indexados de cada entrevista (JSON comprimido), já que interview_search não guarda o texto
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_search_docs (
+            interview_id INTEGER PRIMARY KEY,
+            indexed BLOB NOT NULL
+        )
+    """)
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS questions (
@@ -73,5 +211,170 @@ def create_table():
         )
     """)
 
+    # Fila persistente de jobs (transcrição/análise) processada por jobs.py
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            interview_id INTEGER,
+            payload TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            idempotency_key TEXT UNIQUE,
+            run_after REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            FOREIGN KEY (interview_id) REFERENCES interviews(id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)")
+
+    # Análises em lote por cargo: cada entrevista vira um job 'analysis'; o progresso vem da tabela jobs
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_batches (
+            id TEXT PRIMARY KEY,
+            position_id INTEGER NOT NULL,
+            force INTEGER NOT NULL DEFAULT 0,
+            skipped TEXT,
+            created_at TEXT,
+            FOREIGN KEY (position_id) REFERENCES positions(id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_analysis_batches_position ON analysis_batches (position_id, created_at DESC)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_batch_jobs (
+            batch_id TEXT NOT NULL,
+            interview_id INTEGER NOT NULL,
+            job_id INTEGER NOT NULL,
+            PRIMARY KEY (batch_id, interview_id),
+            FOREIGN KEY (batch_id) REFERENCES analysis_batches(id),
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    """)
+
+    # Uploads de áudio retomáveis (o offset recebido é o tamanho do arquivo parcial em disco)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audio_uploads (
+            id TEXT PRIMARY KEY,
+            interview_id INTEGER NOT NULL,
+            filename TEXT,
+            total_size INTEGER,
+            duration REAL,
+            status TEXT NOT NULL DEFAULT 'uploading',
+            audio_path TEXT,
+            created_at TEXT,
+            FOREIGN KEY (interview_id) REFERENCES interviews(id)
+        )
+    """)
+
+    # Respostas do LLM por hash de (modelo, prompt, dados da entrevista)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            last_hit_at TEXT
+        )
+    """)
+
     conn.commit()
+    run_migrations(conn)
     conn.close()
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    return any(row["name"] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _add_column(conn, table: str, column: str, definition: str):
+    """ALTER TABLE só se a coluna ainda não existir (bancos criados antes dela)"""
+    if not _column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migration_001_vacancies(conn):
+    _add_column(conn, "positions", "vacancies", "INTEGER DEFAULT 0")
+
+
+def _migration_002_duration(conn):
+    _add_column(conn, "interviews", "duration", "REAL")
+
+
+def _migration_003_indexes(conn):
+    # Listagem por cargo (WHERE position_id = ? ORDER BY date DESC) e COUNT por cargo; o id no fim
+    # do índice desempata a ordem, então a paginação por cursor (valor, id) anda direto no índice
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_interviews_position_date_id ON interviews (position_id, date DESC, id DESC)")
+    # Ranking geral (ORDER BY score DESC, id DESC)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_interviews_score_id ON interviews (score DESC, id DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_interview ON questions (interview_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_global_questions_position ON global_questions (position_id, id DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_interview ON jobs (interview_id, id DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audio_uploads_interview ON audio_uploads (interview_id)")
+    conn.execute("ANALYZE")
+
+
+def _migration_004_split_blobs(conn):
+    # Bancos antigos guardavam transcript/analysis em interviews: copia e remove as colunas
+    now = datetime.now().isoformat()
+    for column, table in (("transcript", "interview_transcripts"), ("analysis", "interview_analyses")):
+        if not _column_exists(conn, "interviews", column):
+            continue
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO {table} (interview_id, {column}, updated_at)
+            SELECT id, {column}, ? FROM interviews WHERE COALESCE({column}, '') != ''
+            """,
+            (now,)
+        )
+        conn.execute(f"ALTER TABLE interviews DROP COLUMN {column}")
+
+
+def _migration_005_search_index(conn):
+    # Indexa as entrevistas que já existiam antes da busca textual
+    rebuild_search_index(conn)
+
+
+# Migrações em ordem; cada versão roda uma única vez e fica registrada em schema_version.
+# Para mudar o schema, acrescente uma nova entrada no fim (nunca altere as já aplicadas).
+MIGRATIONS = [
+    (1, "coluna positions.vacancies", _migration_001_vacancies),
+    (2, "coluna interviews.duration", _migration_002_duration),
+    (3, "índices das consultas de listagem, ranking e perguntas", _migration_003_indexes),
+    (4, "transcript e analysis em tabelas separadas", _migration_004_split_blobs),
+    (5, "índice de busca textual das entrevistas", _migration_005_search_index),
+]
+
+
+def run_migrations(conn):
+    """Aplica as migrações pendentes, cada uma em sua própria transação"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+    applied = {row["version"] for row in conn.execute("SELECT version FROM schema_version")}
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Outro processo pode ter aplicado a migração enquanto esperávamos o lock
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            migrate(conn)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)", (version, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            print(f"[MIGRATION] ❌ Falha na migração {version} ({description})")
+            raise
+        print(f"[MIGRATION] ✅ Migração {version} aplicada: {description}")
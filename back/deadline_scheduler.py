@@ -0,0 +1,58 @@
+import heapq
+import asyncio
+import itertools
+
+
+class DeadlineScheduler:
+    """Um único task por sessão que chama `callback(key, value)` quando o prazo de `key` vence.
+
+    `schedule()` só atualiza o prazo da chave (sem criar task); prazos renovados deixam
+    entradas antigas no heap, que são descartadas quando chegam ao topo.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._deadlines = {}  # {key: (deadline, value)}
+        self._heap = []  # [(deadline, seq, key)]
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def schedule(self, key, delay: float, value=None):
+        deadline = asyncio.get_running_loop().time() + delay
+        self._deadlines[key] = (deadline, value)
+        if not self._heap or deadline < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (deadline, next(self._seq), key))
+
+    def _pop_stale(self):
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            current = self._deadlines.get(key)
+            if current is not None and current[0] == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pop_stale()
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            timeout = self._heap[0][0] - loop.time()
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            _, value = self._deadlines.pop(key)
+            try:
+                await self.callback(key, value)
+            except Exception as e:
+                print(f"[SCHEDULER] ❌ Erro ao processar prazo de {key}: {e}")
@@ -12,6 +12,8 @@ import sqlite3
 import json
 import sys
 import argparse
+from transcript_codec import load_transcript
+from interview_store import TRANSCRIPT_JOIN, decode_stored_safe, save_transcript
 
 DATABASE = "./interviews.db"
 
@@ -21,15 +23,8 @@ def check_diarization(transcript_json):
         return False, "Transcrição vazia"
     
     try:
-        transcript_data = json.loads(transcript_json)
-        
-        # Extrair utterances
-        if isinstance(transcript_data, dict) and "utterances" in transcript_data:
-            utterances = transcript_data["utterances"]
-        elif isinstance(transcript_data, list):
-            utterances = transcript_data
-        else:
-            return False, "Formato inválido"
+        # Extrair utterances (JSON ou formato compacto)
+        utterances = load_transcript(transcript_json)
         
         if not utterances or len(utterances) == 0:
             return False, "Sem utterances"
@@ -51,6 +46,8 @@ def check_diarization(transcript_json):
             
     except json.JSONDecodeError:
         return False, "JSON inválido"
+    except ValueError:
+        return False, "Formato inválido"
     except Exception as e:
         return False, f"Erro: {str(e)}"
 
@@ -60,10 +57,11 @@ def check_all_interviews():
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, name, date, audio_file, transcript
+    cursor.execute(f"""
+        SELECT interviews.id, name, date, audio_file, transcript
         FROM interviews
-        ORDER BY id
+        {TRANSCRIPT_JOIN}
+        ORDER BY interviews.id
     """)
     
     rows = cursor.fetchall()
@@ -80,7 +78,7 @@ def check_all_interviews():
         interview_id = row["id"]
         name = row["name"] or "Sem nome"
         has_audio = bool(row["audio_file"])
-        transcript = row["transcript"]
+        transcript = decode_stored_safe(interview_id, "transcript", row["transcript"])
         
         has_diarization, reason = check_diarization(transcript)
         
@@ -129,13 +127,10 @@ def clear_bad_transcriptions(dry_run=True):
     
     # Executar limpeza
     conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
+    conn.row_factory = sqlite3.Row
     
     for interview_id in bad_ids:
-        cursor.execute(
-            "UPDATE interviews SET transcript = '' WHERE id = ?",
-            (interview_id,)
-        )
+        save_transcript(conn, interview_id, "")
         print(f"🧹 Limpou transcrição do ID {interview_id}")
     
     conn.commit()
@@ -0,0 +1,319 @@
+import os
+import re
+import html
+import json
+import zlib
+import unicodedata
+from datetime import datetime
+from transcript_codec import load_transcript
+
+# Transcrição e análise ficam em interview_transcripts / interview_analyses (1:1 com interviews).
+# As funções recebem a conexão de quem chama; o commit fica a cargo do chamador.
+
+# Formato de gravação de transcript/analysis: "zlib" (BLOB comprimido) ou "none" (texto)
+BLOB_COMPRESSION = os.getenv("BLOB_COMPRESSION", "zlib")
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+# Valores menores que isso (em bytes) são gravados como texto
+BLOB_COMPRESSION_MIN_BYTES = int(os.getenv("BLOB_COMPRESSION_MIN_BYTES", "256"))
+
+# Primeiro byte do BLOB indica o formato do restante; valores TEXT são gravações antigas sem compressão
+BLOB_VERSION_ZLIB = 1
+
+# JOINs para quem precisa das colunas transcript/analysis junto com os metadados
+TRANSCRIPT_JOIN = "LEFT JOIN interview_transcripts ON interview_transcripts.interview_id = interviews.id"
+ANALYSIS_JOIN = "LEFT JOIN interview_analyses ON interview_analyses.interview_id = interviews.id"
+
+
+def encode_stored(text: str, compression: str = None):
+    """Valor a gravar: BLOB [versão][zlib(utf-8)] ou o próprio texto"""
+    data = text.encode("utf-8")
+    if (compression or BLOB_COMPRESSION) != "zlib" or len(data) < BLOB_COMPRESSION_MIN_BYTES:
+        return text
+    return bytes([BLOB_VERSION_ZLIB]) + zlib.compress(data, BLOB_COMPRESSION_LEVEL)
+
+
+def decode_stored(value):
+    """Texto de um valor gravado por encode_stored (BLOB versionado ou texto); lança ValueError se a versão for desconhecida"""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value[:1] == bytes([BLOB_VERSION_ZLIB]):
+        return zlib.decompress(value[1:]).decode("utf-8")
+    raise ValueError(f"Formato de armazenamento desconhecido: {value[:1].hex()}")
+
+
+def decode_stored_safe(interview_id: int, column: str, value):
+    """decode_stored para leituras: valor corrompido (versão desconhecida, zlib truncado) vira None com um aviso"""
+    try:
+        return decode_stored(value)
+    except (ValueError, zlib.error) as e:
+        print(f"[WARNING] {column} da entrevista {interview_id} ilegível ({e}), tratando como vazio")
+        return None
+
+
+def get_transcript(conn, interview_id: int):
+    row = conn.execute(
+        "SELECT transcript FROM interview_transcripts WHERE interview_id = ?", (interview_id,)
+    ).fetchone()
+    return decode_stored_safe(interview_id, "transcript", row["transcript"]) if row else None
+
+
+def save_transcript(conn, interview_id: int, transcript: str) -> int:
+    """Grava (ou remove, se vazio) a transcrição; retorna 0 se a entrevista não existir"""
+    if not transcript:
+        conn.execute("DELETE FROM interview_transcripts WHERE interview_id = ?", (interview_id,))
+        index_interview(conn, interview_id)
+        return conn.execute("SELECT COUNT(*) FROM interviews WHERE id = ?", (interview_id,)).fetchone()[0]
+    cursor = conn.execute(
+        """
+        INSERT INTO interview_transcripts (interview_id, transcript, updated_at)
+        SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM interviews WHERE id = ?)
+        ON CONFLICT(interview_id) DO UPDATE SET transcript = excluded.transcript, updated_at = excluded.updated_at
+        """,
+        (interview_id, encode_stored(transcript), datetime.now().isoformat(), interview_id)
+    )
+    if cursor.rowcount:
+        index_interview(conn, interview_id)
+    return cursor.rowcount
+
+
+def get_analysis(conn, interview_id: int):
+    row = conn.execute(
+        "SELECT analysis FROM interview_analyses WHERE interview_id = ?", (interview_id,)
+    ).fetchone()
+    return decode_stored_safe(interview_id, "analysis", row["analysis"]) if row else None
+
+
+def save_analysis(conn, interview_id: int, analysis: str, score) -> int:
+    """Grava a análise e atualiza interviews.score (usado nas listagens e no ranking)"""
+    cursor = conn.execute("UPDATE interviews SET score = ? WHERE id = ?", (score, interview_id))
+    if cursor.rowcount == 0:
+        return 0
+    conn.execute(
+        """
+        INSERT INTO interview_analyses (interview_id, analysis, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(interview_id) DO UPDATE SET analysis = excluded.analysis, updated_at = excluded.updated_at
+        """,
+        (interview_id, encode_stored(analysis), datetime.now().isoformat())
+    )
+    index_interview(conn, interview_id)
+    return 1
+
+
+# Busca textual: interview_search (FTS5) tem uma linha por entrevista com rowid = interviews.id.
+# Como transcript/analysis podem estar comprimidos, o índice é mantido por aqui (e não por
+# triggers): save_transcript, save_analysis e quem altera nome/anotações chamam index_interview;
+# quem apaga entrevistas chama index_interview depois do DELETE.
+#
+# A tabela FTS5 não guarda o texto (content=''), só o índice invertido. O que foi indexado fica em
+# interview_search_docs, comprimido com encode_stored: o 'delete' do FTS5 precisa dos valores
+# originais e os trechos destacados dos resultados são montados a partir dele.
+
+# Pesos do bm25 por coluna: name, notes, transcript, analysis
+SEARCH_COLUMN_WEIGHTS = (4.0, 2.0, 1.0, 2.0)
+# Quantidade de palavras no trecho destacado de cada resultado
+SEARCH_SNIPPET_WORDS = 16
+
+
+def transcript_search_text(transcript: str) -> str:
+    try:
+        utterances = load_transcript(transcript)
+    except (ValueError, TypeError):
+        return ""
+    return "\n".join(utt.get("text") or "" for utt in utterances if isinstance(utt, dict))
+
+
+def analysis_search_text(analysis: str) -> str:
+    """Todos os textos da análise (summary, positives, skills, experiences...) sem as chaves"""
+    try:
+        value = json.loads(analysis) if analysis else None
+    except ValueError:
+        return analysis or ""
+    texts = []
+
+    def collect(item):
+        if isinstance(item, str):
+            texts.append(item)
+        elif isinstance(item, dict):
+            for child in item.values():
+                collect(child)
+        elif isinstance(item, list):
+            for child in item:
+                collect(child)
+
+    collect(value)
+    return "\n".join(texts)
+
+
+def unindex_interview(conn, interview_id: int):
+    """Remove a entrevista do índice de busca, se estiver indexada"""
+    row = conn.execute(
+        "SELECT indexed FROM interview_search_docs WHERE interview_id = ?", (interview_id,)
+    ).fetchone()
+    if not row:
+        return
+    try:
+        values = json.loads(decode_stored(row["indexed"]))
+    except (ValueError, zlib.error) as e:
+        # Sem os valores indexados não dá para tirar só esta linha do FTS5: refaz o índice inteiro
+        print(f"[WARNING] Índice de busca da entrevista {interview_id} ilegível ({e}), recriando o índice")
+        rebuild_search_index(conn)
+        unindex_interview(conn, interview_id)
+        return
+    conn.execute(
+        """
+        INSERT INTO interview_search (interview_search, rowid, name, notes, transcript, analysis)
+        VALUES ('delete', ?, ?, ?, ?, ?)
+        """,
+        (interview_id, *values)
+    )
+    conn.execute("DELETE FROM interview_search_docs WHERE interview_id = ?", (interview_id,))
+
+
+def index_interview(conn, interview_id: int):
+    """Regrava a linha da entrevista no índice de busca (ou a remove, se a entrevista não existir)"""
+    unindex_interview(conn, interview_id)
+    row = conn.execute("SELECT name, notes FROM interviews WHERE id = ?", (interview_id,)).fetchone()
+    if not row:
+        return
+    values = (
+        row["name"] or "",
+        row["notes"] or "",
+        transcript_search_text(get_transcript(conn, interview_id)),
+        analysis_search_text(get_analysis(conn, interview_id)),
+    )
+    conn.execute(
+        "INSERT INTO interview_search (rowid, name, notes, transcript, analysis) VALUES (?, ?, ?, ?, ?)",
+        (interview_id, *values)
+    )
+    conn.execute(
+        "INSERT INTO interview_search_docs (interview_id, indexed) VALUES (?, ?)",
+        (interview_id, encode_stored(json.dumps(values, ensure_ascii=False)))
+    )
+
+
+def clear_search_index(conn):
+    """Esvazia o índice de busca (para quem apaga todas as entrevistas de uma vez)"""
+    conn.execute("INSERT INTO interview_search (interview_search) VALUES ('delete-all')")
+    conn.execute("DELETE FROM interview_search_docs")
+
+
+def rebuild_search_index(conn):
+    """Recria o índice de busca de todas as entrevistas"""
+    clear_search_index(conn)
+    for row in conn.execute("SELECT id FROM interviews").fetchall():
+        index_interview(conn, row["id"])
+
+
+def build_match_query(query: str) -> str:
+    """Converte o texto digitado em uma expressão MATCH segura: todas as palavras (AND),
+    `palavra*` busca por prefixo e "entre aspas" busca a frase exata"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\w+\*?)', query):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif word.endswith("*"):
+            terms.append(f'"{word[:-1]}"*')
+        else:
+            terms.append(f'"{word}"')
+    return " ".join(terms)
+
+
+def normalize_search_word(word: str) -> str:
+    """Mesma normalização do tokenizer (unicode61, remove_diacritics 2): minúsculas e sem acentos"""
+    decomposed = unicodedata.normalize("NFD", word.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _search_terms(query: str) -> list:
+    """(termo normalizado, é prefixo) de cada palavra da busca, no formato de build_match_query"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\w+\*?)', query):
+        if phrase:
+            terms.extend((normalize_search_word(w), False) for w in re.findall(r"\w+", phrase))
+        elif word.endswith("*"):
+            terms.append((normalize_search_word(word[:-1]), True))
+        else:
+            terms.append((normalize_search_word(word), False))
+    return terms
+
+
+def build_snippet(texts, terms: list, size: int = SEARCH_SNIPPET_WORDS) -> str:
+    """Trecho de até `size` palavras da coluna com mais ocorrências, com as ocorrências em <mark>.
+
+    O retorno é HTML: o texto vem do candidato/entrevistador e é escapado, só as tags <mark> são nossas.
+    """
+    best = None
+    for text in texts:
+        words = list(re.finditer(r"[^\W_]+", text or ""))
+        hits = {
+            i for i, word in enumerate(words)
+            if any(
+                normalize_search_word(word.group()).startswith(term) if prefix
+                else normalize_search_word(word.group()) == term
+                for term, prefix in terms
+            )
+        }
+        if words and (best is None or len(hits) > len(best[2])):
+            best = (text, words, hits)
+    if best is None:
+        return ""
+
+    text, words, hits = best
+    start = max(0, min(min(hits, default=0) - size // 4, len(words) - size))
+    end = min(len(words), start + size)
+    parts = ["…" if start > 0 else ""]
+    position = words[start].start()
+    for i in range(start, end):
+        word = words[i]
+        parts.append(html.escape(text[position:word.start()]))
+        parts.append(f"<mark>{html.escape(word.group())}</mark>" if i in hits else html.escape(word.group()))
+        position = word.end()
+    parts.append("…" if end < len(words) else "")
+    return "".join(parts)
+
+
+def search_interviews(conn, query: str, position_id: int = None, limit: int = 20, offset: int = 0) -> list:
+    """Entrevistas que casam com a busca, das mais relevantes para as menos, com trecho destacado"""
+    match = build_match_query(query)
+    if not match:
+        return []
+    where = ["interview_search MATCH ?"]
+    params = [match]
+    if position_id:
+        where.append("interviews.position_id = ?")
+        params.append(position_id)
+    weights = ", ".join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+    rows = conn.execute(
+        f"""
+        SELECT
+            interviews.id,
+            interviews.name,
+            interviews.date,
+            interviews.score,
+            positions.id AS position_id,
+            positions.position AS position,
+            bm25(interview_search, {weights}) AS rank,
+            interview_search_docs.indexed
+        FROM interview_search
+        JOIN interviews ON interviews.id = interview_search.rowid
+        JOIN interview_search_docs ON interview_search_docs.interview_id = interview_search.rowid
+        LEFT JOIN positions ON interviews.position_id = positions.id
+        WHERE {' AND '.join(where)}
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+        """,
+        (*params, limit, offset)
+    ).fetchall()
+
+    terms = _search_terms(query)
+    results = []
+    for row in rows:
+        result = {key: row[key] for key in row.keys() if key != "indexed"}
+        indexed = decode_stored_safe(row["id"], "índice de busca", row["indexed"])
+        result["snippet"] = build_snippet(json.loads(indexed), terms) if indexed else ""
+        results.append(result)
+    return results
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import traceback
+from datetime import datetime
+from database import db_connection
+
+# Número de workers consumindo a fila (throughput = JOB_WORKERS jobs simultâneos)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Backoff exponencial entre tentativas: base, 2*base, 4*base...
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_POLL_INTERVAL_SECONDS = 1.0
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_handlers = {}
+_limits = {}  # {kind: {"concurrency": int, "interval": segundos entre inícios}}
+_next_start = {}  # {kind: time.monotonic() a partir do qual o próximo job pode começar}
+_workers = []
+_wakeup = None
+_loop = None
+
+
+def register_job_handler(kind: str, handler, concurrency: int = None, rate_per_minute: float = None):
+    """Registra a coroutine que executa jobs do tipo `kind`: handler(interview_id, **payload).
+
+    `concurrency` limita os jobs do tipo rodando ao mesmo tempo e `rate_per_minute` os inícios
+    por minuto; os workers simplesmente pulam o tipo enquanto o limite estiver atingido.
+    """
+    _handlers[kind] = handler
+    _limits[kind] = {
+        "concurrency": concurrency or 0,
+        "interval": 60 / rate_per_minute if rate_per_minute else 0,
+    }
+
+
+def job_to_dict(row) -> dict:
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "interview_id": row["interview_id"],
+        "payload": json.loads(row["payload"]) if row["payload"] else {},
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "max_attempts": row["max_attempts"],
+        "last_error": row["last_error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def _wake_workers():
+    if _loop is not None and _wakeup is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def enqueue_job(kind: str, interview_id: int, payload: dict = None, idempotency_key: str = None) -> int:
+    """Enfileira um job e retorna seu id.
+
+    Com `idempotency_key`, um job ainda na fila ou rodando é reaproveitado;
+    um job já concluído ou com falha é recolocado na fila com o mesmo id e o novo payload.
+    Faz I/O bloqueante no SQLite: em rotas async, chame via asyncio.to_thread.
+    """
+    now = datetime.now().isoformat()
+    with db_connection() as conn:
+        try:
+            cursor = conn.execute(
+                """
+                INSERT INTO jobs (kind, interview_id, payload, status, max_attempts, idempotency_key, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)
+                """,
+                (kind, interview_id, json.dumps(payload or {}), JOB_MAX_ATTEMPTS, idempotency_key, now, now)
+            )
+            conn.commit()
+            job_id = cursor.lastrowid
+            print(f"[JOBS] 📥 Job {job_id} ({kind}) enfileirado para interview {interview_id}")
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            row = conn.execute(
+                "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+            job_id = row["id"]
+            if row["status"] in ("queued", "running"):
+                print(f"[JOBS] ♻️  Job {job_id} ({kind}) já está {row['status']} - reaproveitando")
+                return job_id
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'queued', payload = ?, attempts = 0, run_after = 0, last_error = NULL, updated_at = ?
+                WHERE id = ?
+                """,
+                (json.dumps(payload or {}), now, job_id)
+            )
+            conn.commit()
+            print(f"[JOBS] 🔁 Job {job_id} ({kind}) recolocado na fila")
+    _wake_workers()
+    return job_id
+
+
+def get_job(job_id: int):
+    with db_connection() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return job_to_dict(row) if row else None
+
+
+def _blocked_kinds(conn) -> list:
+    """Tipos de job que não podem começar agora por limite de concorrência ou de taxa"""
+    now = time.monotonic()
+    blocked = [kind for kind, limit in _limits.items() if limit["interval"] and _next_start.get(kind, 0) > now]
+    limited = [kind for kind, limit in _limits.items() if limit["concurrency"] and kind not in blocked]
+    if limited:
+        rows = conn.execute(
+            f"""
+            SELECT kind, COUNT(*) AS running FROM jobs
+            WHERE status = 'running' AND kind IN ({', '.join('?' * len(limited))})
+            GROUP BY kind
+            """,
+            limited
+        ).fetchall()
+        blocked += [row["kind"] for row in rows if row["running"] >= _limits[row["kind"]]["concurrency"]]
+    return blocked
+
+
+def _claim_next_job():
+    """Marca atomicamente o próximo job pronto como 'running' e o retorna"""
+    with db_connection() as conn:
+        # O BEGIN IMMEDIATE serializa os workers: contagem de running e _next_start ficam consistentes
+        conn.execute("BEGIN IMMEDIATE")
+        blocked = _blocked_kinds(conn)
+        kind_filter = f"AND kind NOT IN ({', '.join('?' * len(blocked))})" if blocked else ""
+        row = conn.execute(
+            f"""
+            SELECT * FROM jobs
+            WHERE status = 'queued' AND run_after <= ? {kind_filter}
+            ORDER BY run_after, id
+            LIMIT 1
+            """,
+            (time.time(), *blocked)
+        ).fetchone()
+        if not row:
+            conn.rollback()
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (datetime.now().isoformat(), row["id"])
+        )
+        conn.commit()
+        limit = _limits.get(row["kind"])
+        if limit and limit["interval"]:
+            _next_start[row["kind"]] = max(_next_start.get(row["kind"], 0), time.monotonic()) + limit["interval"]
+    job = job_to_dict(row)
+    job["attempts"] += 1
+    job["status"] = "running"
+    return job
+
+
+def _finish_job(job: dict, error: str = None):
+    now = datetime.now().isoformat()
+    with db_connection() as conn:
+        if error is None:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE id = ?",
+                (now, job["id"])
+            )
+        elif job["attempts"] >= job["max_attempts"]:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE id = ?",
+                (error, now, job["id"])
+            )
+        else:
+            delay = JOB_RETRY_BASE_SECONDS * (2 ** (job["attempts"] - 1))
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', last_error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                (error, time.time() + delay, now, job["id"])
+            )
+            print(f"[JOBS] ⏳ Job {job['id']} será tentado novamente em {delay:.0f}s")
+        conn.commit()
+
+
+async def _save_job_result(job: dict, error: str = None):
+    """Grava o resultado fora do event loop; se o banco falhar, tenta mais uma vez antes de desistir"""
+    for attempt in range(2):
+        try:
+            await asyncio.to_thread(_finish_job, job, error)
+            # Libera a vaga de concorrência do tipo para os workers que estão esperando
+            _wake_workers()
+            return
+        except sqlite3.Error as e:
+            print(f"[JOBS] ⚠️  Não foi possível gravar o resultado do job {job['id']}: {e}")
+            if attempt == 0:
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+    # Continua 'running' e volta para a fila em _requeue_interrupted_jobs no próximo start
+    print(f"[JOBS] ⚠️  Job {job['id']} ficará como 'running' até o servidor reiniciar")
+
+
+def _is_permanent_error(e: Exception) -> bool:
+    """Erros determinísticos: HTTPException 4xx dos handlers e ValueError.
+
+    JSONDecodeError fica de fora: vem de respostas do LLM, que mudam de uma tentativa para outra.
+    """
+    if isinstance(e, json.JSONDecodeError):
+        return False
+    status_code = getattr(e, "status_code", None)
+    return isinstance(e, ValueError) or (isinstance(status_code, int) and 400 <= status_code < 500)
+
+
+async def _run_job(job: dict):
+    handler = _handlers.get(job["kind"])
+    print(f"[JOBS] ▶️  Job {job['id']} ({job['kind']}) tentativa {job['attempts']}/{job['max_attempts']}")
+    if handler is None:
+        job["attempts"] = job["max_attempts"]
+        await _save_job_result(job, f"Tipo de job desconhecido: {job['kind']}")
+        return
+    try:
+        await handler(job["interview_id"], **job["payload"])
+    except Exception as e:
+        error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        print(f"[JOBS] ❌ Job {job['id']} falhou: {error}")
+        traceback.print_exc()
+        if _is_permanent_error(e):
+            # Tentar de novo daria o mesmo erro (entrevista inexistente, transcript vazio...)
+            job["attempts"] = job["max_attempts"]
+        await _save_job_result(job, str(error))
+        return
+    print(f"[JOBS] ✅ Job {job['id']} ({job['kind']}) concluído")
+    await _save_job_result(job)
+
+
+async def _worker(worker_id: int):
+    while True:
+        # Claim e gravação do resultado rodam em threads: um banco ocupado (até DB_BUSY_TIMEOUT_MS)
+        # não pode travar o event loop
+        try:
+            job = await asyncio.to_thread(_claim_next_job)
+        except sqlite3.Error as e:
+            print(f"[JOBS] ⚠️  Worker {worker_id} não conseguiu buscar job: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+
+        try:
+            await _run_job(job)
+        except sqlite3.Error as e:
+            print(f"[JOBS] ⚠️  Worker {worker_id} teve erro de banco no job {job['id']}: {e}")
+
+
+def _requeue_interrupted_jobs():
+    """Jobs que estavam 'running' quando o processo parou voltam para a fila"""
+    with db_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+            (datetime.now().isoformat(),)
+        )
+        conn.commit()
+        if cursor.rowcount:
+            print(f"[JOBS] 🔄 {cursor.rowcount} job(s) interrompido(s) recolocado(s) na fila")
+
+
+async def start_workers(count: int = JOB_WORKERS):
+    global _wakeup, _loop
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    _requeue_interrupted_jobs()
+    for worker_id in range(count):
+        _workers.append(asyncio.create_task(_worker(worker_id)))
+    print(f"[JOBS] 🚀 {count} worker(s) iniciados")
+
+
+async def stop_workers():
+    global _wakeup, _loop
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _wakeup = None
+    _loop = None
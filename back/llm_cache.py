@@ -0,0 +1,39 @@
+import hashlib
+from datetime import datetime
+from database import db_connection
+
+
+def llm_cache_key(model: str, prompt: str) -> str:
+    """Hash do modelo + prompt completo (template + JSON da entrevista)"""
+    hasher = hashlib.sha256()
+    hasher.update(model.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(prompt.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def get_cached_response(cache_key: str):
+    """Retorna a resposta salva para a chave (e contabiliza o hit), ou None"""
+    with db_connection() as conn:
+        row = conn.execute("SELECT response FROM llm_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+        if not row:
+            return None
+        conn.execute(
+            "UPDATE llm_cache SET hits = hits + 1, last_hit_at = ? WHERE cache_key = ?",
+            (datetime.now().isoformat(), cache_key)
+        )
+        conn.commit()
+    return row["response"]
+
+
+def save_cached_response(cache_key: str, model: str, response: str):
+    with db_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO llm_cache (cache_key, model, response, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET response = excluded.response, created_at = excluded.created_at
+            """,
+            (cache_key, model, response, datetime.now().isoformat())
+        )
+        conn.commit()
@@ -1,12 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import database
+import jobs
 from routers import positions, interviews, interview_processing, global_questions
+from routers import jobs as jobs_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await jobs.start_workers()
+    upload_sweeper = asyncio.create_task(interview_processing.sweep_stale_uploads())
+    yield
+    upload_sweeper.cancel()
+    await jobs.stop_workers()
+    database.pool.close_all()
 
 app = FastAPI(
     title="API de Resumos de Entrevistas",
     description="Uma API para gerar resumos de transcrições usando o inteligência artificial",
-    version="0.0.1"
+    version="0.0.1",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,6 +41,8 @@ app.include_router(interview_processing.router)
 
 app.include_router(global_questions.router)
 
+app.include_router(jobs_router.router)
+
 @app.get("/")
 def read_root():
     return {"message": "API de Resumos de Entrevistas está online"}
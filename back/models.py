@@ -19,3 +19,11 @@ class QuestionCreateRequest(BaseModel):
 
 class NotesUpdateRequest(BaseModel):
     notes: str
+
+class AudioUploadInitRequest(BaseModel):
+    filename: str
+    total_size: int | None = None
+    duration: float | None = None
+
+class AudioUploadFinalizeRequest(BaseModel):
+    sha256: str | None = None
@@ -0,0 +1,54 @@
+import json
+import base64
+
+
+def encode_cursor(*values) -> str:
+    """Token opaco com os valores de ordenação do último item da página"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Valores de um token gerado por encode_cursor; lança ValueError se for inválido"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(values, list) or len(values) != size or \
+            not all(v is None or isinstance(v, (str, int, float)) for v in values):
+        raise ValueError("Cursor inválido")
+    return values
+
+
+def fetch_keyset_page(conn, select: str, where: list, params: list, sort_column: str, id_column: str,
+                      after: list, limit: int, offset: int = 0) -> list:
+    """Linhas de `select` em ORDER BY sort_column DESC, id DESC, começando depois do cursor.
+
+    `after` é [valor, id] do último item da página anterior (ou None para paginar por
+    offset). Cada página é uma busca direta no índice (sort_column DESC, id DESC), então
+    páginas profundas custam o mesmo que a primeira. No SQLite NULL vem por último em
+    DESC; essas linhas são buscadas à parte quando os valores não nulos acabam.
+    """
+    def query(extra: list, extra_params: list, count: int, skip: int = 0):
+        conditions = where + extra
+        where_sql = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return conn.execute(
+            f"{select}{where_sql} ORDER BY {sort_column} DESC, {id_column} DESC LIMIT ? OFFSET ?",
+            (*params, *extra_params, count, skip)
+        ).fetchall()
+
+    if after is None:
+        return query([], [], limit, offset)
+
+    value, last_id = after
+    rows = []
+    if value is not None:
+        rows = query([f"({sort_column}, {id_column}) < (?, ?)"], [value, last_id], limit)
+        last_id = None  # a parte com NULL começa do início
+    if len(rows) < limit:
+        extra, extra_params = [f"{sort_column} IS NULL"], []
+        if last_id is not None:
+            extra.append(f"{id_column} < ?")
+            extra_params.append(last_id)
+        rows += query(extra, extra_params, limit - len(rows))
+    return rows
@@ -16,6 +16,8 @@ import argparse
 import assemblyai as aai
 from dotenv import load_dotenv
 import time
+from transcript_codec import dump_transcript, load_transcript
+from interview_store import TRANSCRIPT_JOIN, decode_stored_safe, save_transcript
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -29,8 +31,7 @@ def check_diarization(transcript_json):
         return False
     
     try:
-        transcript_data = json.loads(transcript_json)
-        utterances = transcript_data.get("utterances", []) if isinstance(transcript_data, dict) else transcript_data
+        utterances = load_transcript(transcript_json)
         
         if not utterances or len(utterances) == 0:
             return False
@@ -51,7 +52,10 @@ def reprocess_interview(interview_id):
     cursor = conn.cursor()
     
     # Buscar entrevista
-    cursor.execute("SELECT id, name, audio_file, transcript FROM interviews WHERE id = ?", (interview_id,))
+    cursor.execute(
+        f"SELECT interviews.id, name, audio_file, transcript FROM interviews {TRANSCRIPT_JOIN} WHERE interviews.id = ?",
+        (interview_id,)
+    )
     row = cursor.fetchone()
     
     if not row:
@@ -80,7 +84,7 @@ def reprocess_interview(interview_id):
     print(f"📦 Tamanho: {file_size_mb:.2f} MB")
     
     # Verificar se já tem diarização
-    has_diarization = check_diarization(row["transcript"])
+    has_diarization = check_diarization(decode_stored_safe(row["id"], "transcript", row["transcript"]))
     if has_diarization:
         print(f"✅ Entrevista JÁ tem diarização adequada - pulando")
         conn.close()
@@ -135,13 +139,9 @@ def reprocess_interview(interview_id):
                 utt_list.append(utt_dict)
             
             # Salvar no banco
-            transcript_data = {"utterances": utt_list}
-            transcript_json = json.dumps(transcript_data)
+            transcript_json = dump_transcript(utt_list)
             
-            cursor.execute(
-                "UPDATE interviews SET transcript = ? WHERE id = ?",
-                (transcript_json, interview_id)
-            )
+            save_transcript(conn, interview_id, transcript_json)
             conn.commit()
             conn.close()
             
@@ -171,19 +171,21 @@ def find_interviews_to_process(mode="all"):
     
     if mode == "without-diarization":
         # Buscar apenas entrevistas com áudio mas sem diarização adequada
-        cursor.execute("""
-            SELECT id, name, audio_file, transcript
+        cursor.execute(f"""
+            SELECT interviews.id, name, audio_file, transcript
             FROM interviews
+            {TRANSCRIPT_JOIN}
             WHERE audio_file IS NOT NULL AND audio_file != ''
-            ORDER BY id
+            ORDER BY interviews.id
         """)
     else:
         # Buscar todas com áudio
-        cursor.execute("""
-            SELECT id, name, audio_file, transcript
+        cursor.execute(f"""
+            SELECT interviews.id, name, audio_file, transcript
             FROM interviews
+            {TRANSCRIPT_JOIN}
             WHERE audio_file IS NOT NULL AND audio_file != ''
-            ORDER BY id
+            ORDER BY interviews.id
         """)
     
     rows = cursor.fetchall()
@@ -193,7 +195,7 @@ def find_interviews_to_process(mode="all"):
     if mode == "without-diarization":
         to_process = []
         for row in rows:
-            if not check_diarization(row["transcript"]):
+            if not check_diarization(decode_stored_safe(row["id"], "transcript", row["transcript"])):
                 to_process.append(row)
         return to_process
     else:
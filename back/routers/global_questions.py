@@ -2,7 +2,7 @@ import sqlite3
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from database import get_db_connection
+from database import db_connection
 
 router = APIRouter(
     prefix="/questions",
@@ -16,18 +16,17 @@ class GlobalQuestionCreateRequest(BaseModel):
 @router.post("")
 def create_global_question(request: GlobalQuestionCreateRequest):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO global_questions (question, position_id)
-            VALUES (?, ?)
-            """,
-            (request.question, request.position_id)
-        )
-        qid = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO global_questions (question, position_id)
+                VALUES (?, ?)
+                """,
+                (request.question, request.position_id)
+            )
+            qid = cursor.lastrowid
+            conn.commit()
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inserir pergunta: {e}")
 
@@ -39,28 +38,27 @@ def create_global_question(request: GlobalQuestionCreateRequest):
 @router.get("")
 def get_global_questions(position_id: int = Query(None)):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        if position_id:
-            cursor.execute(
-                """
-                SELECT id, question, position_id, created_at FROM global_questions
-                WHERE position_id = ?
-                ORDER BY id DESC
-                """,
-                (position_id,)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT id, question, position_id, created_at FROM global_questions
-                WHERE position_id IS NULL
-                ORDER BY id DESC
-                """
-            )
-        rows = cursor.fetchall()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            if position_id:
+                cursor.execute(
+                    """
+                    SELECT id, question, position_id, created_at FROM global_questions
+                    WHERE position_id = ?
+                    ORDER BY id DESC
+                    """,
+                    (position_id,)
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT id, question, position_id, created_at FROM global_questions
+                    WHERE position_id IS NULL
+                    ORDER BY id DESC
+                    """
+                )
+            rows = cursor.fetchall()
         questions = [{"id": row["id"], "question": row["question"], "position_id": row["position_id"], "created_at": row["created_at"]} for row in rows]
-        conn.close()
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar perguntas: {e}")
     
@@ -69,12 +67,11 @@ def get_global_questions(position_id: int = Query(None)):
 @router.delete("/{question_id}")
 def delete_global_question(question_id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM global_questions WHERE id = ?", (question_id,))
-        conn.commit()
-        deleted = cursor.rowcount
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM global_questions WHERE id = ?", (question_id,))
+            conn.commit()
+            deleted = cursor.rowcount
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Erro ao deletar pergunta")
     
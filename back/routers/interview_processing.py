@@ -2,17 +2,35 @@ import json
 import os
 import sqlite3
 import assemblyai as aai
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query, UploadFile, File
-from fastapi.responses import JSONResponse
-from database import get_db_connection
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query, UploadFile, File, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from database import db_connection
+from interview_store import TRANSCRIPT_JOIN, decode_stored_safe, get_transcript, save_transcript, save_analysis
+from transcription import transcribe_file, utterances_to_dicts, transcript_waiter, notify_transcript_saved
+from jobs import enqueue_job, register_job_handler
+from llm_cache import llm_cache_key, get_cached_response, save_cached_response
+from singleflight import SingleFlight
+from analysis_pipeline import ANALYSIS_MAX_PROMPT_TOKENS, estimate_tokens, build_reduce_prompt
+from transcript_codec import dump_transcript, load_transcript, transcript_for_prompt
+from uploads import (
+    UPLOAD_DIR, PARTIAL_UPLOAD_DIR, PARTIAL_UPLOAD_TTL_HOURS, MAX_UPLOAD_BYTES, UploadTooLargeError,
+    save_upload_file, append_stream, partial_upload_path, received_bytes, sha256_file
+)
+from models import AudioUploadInitRequest, AudioUploadFinalizeRequest
+from wav_writer import StreamingWavWriter
+from audio_relay import AudioRelay
+from deadline_scheduler import DeadlineScheduler
+from transcript_updates import TranscriptUpdateBuffer
+from suggestion_trigger import SuggestionTrigger
+from session_transcript import SessionTranscript
 import asyncio
 from datetime import datetime
 from openai import AsyncOpenAI
-import aiofiles
 from dotenv import load_dotenv
 import websockets
 import base64
-import struct
+import uuid
+import time
 
 load_dotenv()
 
@@ -22,6 +40,11 @@ ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
 aai.settings.api_key = ASSEMBLYAI_API_KEY
 openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
+# Silêncio (em segundos) após o qual um turn parcial do tempo real é finalizado
+TURN_SILENCE_SECONDS = 4.0
+# Janela de conversa (em segundos) enviada ao LLM para sugerir perguntas
+SUGGESTION_WINDOW_SECONDS = 50
+
 router = APIRouter(
     prefix="/positions/interviews",
     tags=["Interview Processing"]
@@ -31,53 +54,156 @@ router = APIRouter(
 with open("prompts/prompt_analitico.txt", "r") as f:
     prompt_template = f.read()
 
+ANALYSIS_MODEL = "gpt-4o-mini"
+
+def is_diarized_transcript(transcript_json) -> bool:
+    """Verifica se o transcript salvo tem diarização adequada (mais de um speaker, todos A/B)"""
+    if not transcript_json:
+        return False
+    try:
+        utterances = load_transcript(transcript_json)
+        if len(utterances) == 0:
+            return False
+        speakers = set([utt.get("speaker", "").upper() for utt in utterances if utt.get("speaker")])
+        return len(speakers) > 1 and all(s in ['A', 'B'] for s in speakers if s)
+    except (ValueError, TypeError, AttributeError):
+        return False
+
 @router.patch("/{id}/process/analysis")
-async def generate_analysis(id: int):
+async def generate_analysis(
+    id: int,
+    background: bool = Query(False, description="Enfileira a análise e retorna o id do job"),
+    force: bool = Query(False, description="Ignora o cache e chama o LLM novamente")
+):
+    if background:
+        job_id = await asyncio.to_thread(enqueue_analysis, id, force)
+        return JSONResponse(status_code=202, content={"id": id, "job_id": job_id, "message": "Análise enfileirada"})
+    return await run_analysis(id, force=force)
+
+# Jobs 'analysis' rodando ao mesmo tempo (limitado também por JOB_WORKERS)
+ANALYSIS_JOB_CONCURRENCY = int(os.getenv("ANALYSIS_JOB_CONCURRENCY", "4"))
+# Máximo de jobs 'analysis' iniciados por minuto (0 = sem limite)
+ANALYSIS_JOB_RATE_PER_MINUTE = float(os.getenv("ANALYSIS_JOB_RATE_PER_MINUTE", "30"))
+
+def enqueue_analysis(id: int, force: bool = False) -> int:
+    """Enfileira um job 'analysis' para a entrevista e retorna o id do job"""
+    # force entra na chave: um pedido forçado não pode reaproveitar um job sem force na fila
+    return enqueue_job(
+        "analysis", id, {"force": force} if force else None,
+        idempotency_key=f"analysis:{id}:force" if force else f"analysis:{id}"
+    )
+
+# Análises em andamento por (entrevista, force) (cliques duplos, retries do frontend e jobs).
+# force entra na chave: um pedido forçado não pode receber o resultado de uma análise que usou o cache
+_analyses = SingleFlight("Análise")
+
+async def run_analysis(id: int, force: bool = False):
+    """Executa analyze_interview; chamadas simultâneas para a mesma entrevista compartilham o resultado"""
+    return await _analyses.do((id, force), lambda: analyze_interview(id, force=force))
+
+# Intervalo (em segundos) entre comentários de keep-alive do SSE enquanto nenhuma etapa avança
+ANALYSIS_STREAM_KEEPALIVE_SECONDS = 15
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.get("/{id}/process/analysis/stream")
+async def stream_analysis(
+    id: int,
+    force: bool = Query(False, description="Ignora o cache e chama o LLM novamente")
+):
+    """Gera a análise enviando o progresso por Server-Sent Events
+
+    Eventos: `stage` (etapas: loaded, waiting_diarization, transcribing, cached,
+    summarizing_segments, prompting, validating, saved), `token` (trechos do JSON gerado
+    pelo LLM), e por fim `done` (mesmo corpo do PATCH /process/analysis) ou `error`.
+    Se a entrevista já estiver sendo analisada, só `in_progress` e o resultado são enviados.
+    A análise continua no servidor mesmo se o cliente desconectar.
+    """
+    events = asyncio.Queue()
+    if _analyses.in_flight((id, force)):
+        events.put_nowait({"event": "stage", "stage": "in_progress"})
+
+    async def run():
+        try:
+            response = await _analyses.do((id, force), lambda: analyze_interview(id, force=force, on_event=events.put_nowait))
+            events.put_nowait({"event": "done", **json.loads(response.body)})
+        except HTTPException as e:
+            events.put_nowait({"event": "error", "status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            print(f"[ERROR] ❌ Erro na análise em streaming da entrevista {id}: {e}")
+            events.put_nowait({"event": "error", "status_code": 500, "detail": f"Erro ao gerar análise: {str(e)}"})
+
+    task = asyncio.create_task(run())
+
+    async def event_stream():
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), timeout=ANALYSIS_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            event = item.pop("event")
+            yield _sse_event(event, item)
+            if event in ("done", "error"):
+                break
+        await task
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def analyze_interview(id: int, force: bool = False, on_event=None):
+    """Gera e salva a análise da entrevista (usado pelo endpoint e pelos jobs de análise)
+
+    A resposta do LLM fica em cache por hash de (modelo, prompt, dados da entrevista);
+    com `force=True` o cache é ignorado e atualizado. Se `on_event` for passado, recebe
+    um dict por etapa ({"event": "stage", "stage": ...}) e os tokens do LLM conforme
+    chegam ({"event": "token", "delta": ...}).
+    """
     import time
     start_total = time.time()
+
+    def emit(event: str, **data):
+        if on_event is not None:
+            on_event({"event": event, **data})
     
     print(f"\n{'='*80}")
     print(f"[DEBUG] ⏱️  INICIANDO generate_analysis para interview ID: {id}")
     print(f"{'='*80}\n")
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-            SELECT
-                interviews.transcript,
-                interviews.notes,
-                interviews.audio_file,
-                positions.position AS position,
-                positions.skills AS skills,
-                positions.description AS description
-            FROM interviews
-            JOIN positions ON interviews.position_id = positions.id
-            WHERE interviews.id = ?
-        """,
-        (id,)
-    )
-    row = cursor.fetchone()
+    with db_connection() as conn:
+        row = conn.execute(
+            f"""
+                SELECT
+                    interview_transcripts.transcript,
+                    interviews.notes,
+                    interviews.audio_file,
+                    positions.position AS position,
+                    positions.skills AS skills,
+                    positions.description AS description
+                FROM interviews
+                JOIN positions ON interviews.position_id = positions.id
+                {TRANSCRIPT_JOIN}
+                WHERE interviews.id = ?
+            """,
+            (id,)
+        ).fetchone()
     if not row:
-        conn.close()
         print(f"[ERROR] ❌ Interview {id} não encontrado no banco")
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+    row = dict(row)
+    row["transcript"] = decode_stored_safe(id, "transcript", row["transcript"])
+    emit("stage", stage="loaded")
     
     # Verificar se há transcript e se tem diarização
     has_transcript = bool(row["transcript"])
     has_audio = bool(row["audio_file"] and os.path.exists(row["audio_file"]))
     
     # Verificar se a transcrição tem diarização
-    has_diarization = False
-    if has_transcript:
-        try:
-            transcript_parsed = json.loads(row["transcript"])
-            utterances = transcript_parsed.get("utterances", []) if isinstance(transcript_parsed, dict) else transcript_parsed
-            if isinstance(utterances, list) and len(utterances) > 0:
-                speakers = set([utt.get("speaker", "").upper() for utt in utterances if utt.get("speaker")])
-                has_diarization = len(speakers) > 1 and all(s in ['A', 'B'] for s in speakers if s)
-        except:
-            pass
+    has_diarization = has_transcript and is_diarized_transcript(row["transcript"])
     
     print(f"[INFO] 📊 Status inicial:")
     print(f"  - Transcript existe: {'✅ SIM' if has_transcript else '❌ NÃO'}")
@@ -93,36 +219,35 @@ async def generate_analysis(id: int):
         print(f"\n[INFO] ⏳ Transcrição existe mas SEM diarização adequada")
         print(f"[INFO] 🔄 Aguardando transcrição em background COM diarização...")
         print(f"[INFO] ⏱️  Esperando até 30 segundos...")
+        emit("stage", stage="waiting_diarization", timeout=30)
         
-        # Aguardar até 30 segundos pela transcrição com diarização
-        wait_time = 0
+        # Aguardar até 30 segundos pela transcrição com diarização.
+        # transcribe_audio_background sinaliza o evento assim que salva a transcrição.
         max_wait = 30  # 30 segundos
-        while wait_time < max_wait:
-            await asyncio.sleep(2)
-            wait_time += 2
-            
-            # Verificar se a transcrição foi atualizada
-            cursor.execute("SELECT transcript FROM interviews WHERE id = ?", (id,))
-            check_row = cursor.fetchone()
-            if check_row and check_row["transcript"]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        with transcript_waiter(id) as transcript_saved:
+            while True:
+                # Verificar se a transcrição foi atualizada (após registrar o waiter)
+                with db_connection() as conn:
+                    saved_transcript = get_transcript(conn, id)
+                if is_diarized_transcript(saved_transcript):
+                    waited = max_wait - (deadline - loop.time())
+                    print(f"[INFO] ✅ Transcrição COM diarização detectada após {waited:.1f}s!")
+                    # Atualizar row com a nova transcrição
+                    row = dict(row)
+                    row["transcript"] = saved_transcript
+                    has_diarization = True
+                    break
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
                 try:
-                    check_parsed = json.loads(check_row["transcript"])
-                    check_utts = check_parsed.get("utterances", []) if isinstance(check_parsed, dict) else check_parsed
-                    if isinstance(check_utts, list) and len(check_utts) > 0:
-                        check_speakers = set([u.get("speaker", "").upper() for u in check_utts if u.get("speaker")])
-                        check_has_diarization = len(check_speakers) > 1 and all(s in ['A', 'B'] for s in check_speakers if s)
-                        if check_has_diarization:
-                            print(f"[INFO] ✅ Transcrição COM diarização detectada após {wait_time}s!")
-                            # Atualizar row com a nova transcrição
-                            row = dict(row)
-                            row["transcript"] = check_row["transcript"]
-                            has_diarization = True
-                            break
-                except:
-                    pass
-            
-            if wait_time % 10 == 0:
-                print(f"[INFO] ⏳ Aguardando... {wait_time}/{max_wait}s")
+                    await asyncio.wait_for(transcript_saved.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                transcript_saved.clear()
         
         if not has_diarization:
             print(f"[WARNING] ⚠️  Timeout: transcrição com diarização não apareceu em {max_wait}s")
@@ -135,89 +260,53 @@ async def generate_analysis(id: int):
         
         audio_file = row["audio_file"]
         if not has_audio:
-            conn.close()
             print(f"[ERROR] ❌ Arquivo de áudio não encontrado para interview {id}")
             raise HTTPException(status_code=404, detail="Transcrição e arquivo de áudio não encontrados")
         
         # Fazer transcrição completa do áudio
+        emit("stage", stage="transcribing")
         try:
             start_transcription = time.time()
             
-            config = aai.TranscriptionConfig(
-                speaker_labels=True,
-                speakers_expected=2,
-                language_code="pt"
-            )
             print(f"[DEBUG] 📤 Enviando áudio para AssemblyAI: {audio_file}")
-            transcriber = aai.Transcriber(config=config)
-            transcript = transcriber.transcribe(audio_file)
+            transcript = await transcribe_file(audio_file)
             
             transcription_time = time.time() - start_transcription
             print(f"[TIMING] ⏱️  Transcrição levou: {transcription_time:.2f}s")
             
             if transcript.status == "completed" and transcript.utterances:
                 print(f"[DEBUG] ✅ Transcrição completa com {len(transcript.utterances)} utterances")
-                transcript_data = {"utterances": []}
-                for utt in transcript.utterances:
-                    # Converter speaker para formato consistente (A, B, C...)
-                    # AssemblyAI pode retornar como string "A", "B" ou como número 0, 1
-                    speaker = utt.speaker
-                    if isinstance(speaker, (int, float)):
-                        # Converter número para letra: 0 -> A, 1 -> B, etc.
-                        speaker = chr(65 + int(speaker))  # 65 é o código ASCII de 'A'
-                    elif isinstance(speaker, str):
-                        speaker = speaker.upper()
-                    else:
-                        speaker = "A"  # Fallback
-                    
-                    print(f"[DEBUG] Speaker original: {utt.speaker}, convertido: {speaker}")
-                    
-                    utt_dict = {
-                        "speaker": speaker,
-                        "text": utt.text,
-                        "start": utt.start,
-                        "end": utt.end,
-                    }
-                    transcript_data["utterances"].append(utt_dict)
-                
                 # Salvar transcript no banco
-                transcript_json = json.dumps(transcript_data)
-                cursor.execute(
-                    "UPDATE interviews SET transcript = ? WHERE id = ?", (transcript_json, id)
-                )
-                conn.commit()
+                transcript_json = dump_transcript(utterances_to_dicts(transcript.utterances))
+                with db_connection() as conn:
+                    save_transcript(conn, id, transcript_json)
+                    conn.commit()
+                notify_transcript_saved(id)
                 print(f"[DEBUG] 💾 Transcript salvo no banco para interview {id}")
                 
                 # Atualizar row com o novo transcript
                 row = dict(row)
                 row["transcript"] = transcript_json
             else:
-                conn.close()
                 print(f"[ERROR] ❌ Falha na transcrição: {transcript.status}")
                 raise HTTPException(status_code=500, detail="Falha ao transcrever o áudio")
         except Exception as e:
-            conn.close()
             print(f"[ERROR] ❌ Erro ao transcrever áudio: {e}")
             raise HTTPException(status_code=500, detail=f"Erro ao transcrever áudio: {str(e)}")
     else:
         print(f"\n[INFO] ✅ Usando transcript da transcrição em tempo real (já salvo no banco)")
-        transcript_data = json.loads(row["transcript"])
-        print(f"[INFO] 📝 Transcript contém {len(transcript_data.get('utterances', []))} utterances")
     
-    # Extrair array de utterances do transcript (pode estar como objeto {"utterances": [...]} ou como array direto)
-    transcript_parsed = json.loads(row["transcript"])
-    if isinstance(transcript_parsed, dict) and "utterances" in transcript_parsed:
-        transcript_array = transcript_parsed["utterances"]
-    elif isinstance(transcript_parsed, list):
-        transcript_array = transcript_parsed
-    else:
+    # Extrair array de utterances do transcript ({"utterances": [...]}, array direto ou formato compacto)
+    try:
+        transcript_array = load_transcript(row["transcript"])
+    except ValueError:
         transcript_array = []
+    print(f"[INFO] 📝 Transcript contém {len(transcript_array)} utterances")
     
     print(f"[DEBUG] 📋 Enviando {len(transcript_array)} utterances para análise")
     
     # Verificar se há utterances suficientes
     if len(transcript_array) == 0:
-        conn.close()
         print(f"[ERROR] ❌ Nenhuma utterance encontrada no transcript!")
         raise HTTPException(status_code=400, detail="Transcript vazio. Não é possível gerar análise sem transcrição.")
     
@@ -232,51 +321,89 @@ async def generate_analysis(id: int):
             "skills": json.loads(row["skills"]),
             "description": row["description"]
         },
-        "transcript": transcript_array,  # Enviar apenas o array, não o objeto
+        # Formato compacto ("A: texto" por linha) em vez da lista JSON de falas
+        "transcript": transcript_for_prompt(transcript_array),
         "notes": row["notes"]
     }
-    info_json = json.dumps(interview_info)
+    info_json = json.dumps(interview_info, ensure_ascii=False)
 
     prompt_final = prompt_template + info_json
 
     prompt_size_kb = len(prompt_final) / 1024
-    print(f"\n[INFO] 🤖 Iniciando geração de análise com GPT-4o-mini")
-    print(f"[DEBUG] 📏 Tamanho do prompt: {len(prompt_final)} caracteres ({prompt_size_kb:.2f} KB)")
-    
-    start_gpt = time.time()
-    try:
-        response = await asyncio.wait_for(
-            openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt_final}],
-        response_format={ "type": "json_object" },
-        temperature=0.5
-            ),
-            timeout=120.0  # Timeout de 2 minutos
-        )
-        gpt_time = time.time() - start_gpt
-        print(f"[TIMING] ⏱️  GPT-4o-mini levou: {gpt_time:.2f}s")
-        print(f"[DEBUG] ✅ Análise gerada com sucesso")
-    except asyncio.TimeoutError:
-        conn.close()
-        print(f"[ERROR] ❌ TIMEOUT ao gerar análise (>120s)")
-        raise HTTPException(status_code=504, detail="Timeout ao gerar análise. Tente novamente.")
-    except Exception as e:
-        conn.close()
-        print(f"[ERROR] ❌ Erro ao gerar análise: {e}")
-        raise HTTPException(status_code=500, detail=f"Erro ao gerar análise: {str(e)}")
-    
-    json_gerado = response.choices[0].message.content
+    prompt_tokens = estimate_tokens(prompt_final)
+    print(f"[DEBUG] 📏 Tamanho do prompt: {len(prompt_final)} caracteres ({prompt_size_kb:.2f} KB, ~{prompt_tokens} tokens)")
+
+    cache_key = llm_cache_key(ANALYSIS_MODEL, prompt_final)
+    json_gerado = None if force else get_cached_response(cache_key)
+    cached = json_gerado is not None
+    if cached:
+        print(f"[INFO] ⚡ Análise encontrada no cache ({cache_key[:12]}) - pulando chamada ao GPT")
+        emit("stage", stage="cached")
+    else:
+        print(f"\n[INFO] 🤖 Iniciando geração de análise com GPT-4o-mini")
+        start_gpt = time.time()
+
+        async def complete_analysis():
+            llm_prompt = prompt_final
+            # Transcrição longa demais: resume os trechos em paralelo e consolida (map-reduce)
+            if prompt_tokens > ANALYSIS_MAX_PROMPT_TOKENS:
+                print(f"[INFO] 📚 Prompt (~{prompt_tokens} tokens) acima do limite de {ANALYSIS_MAX_PROMPT_TOKENS} - usando map-reduce")
+                emit("stage", stage="summarizing_segments", prompt_tokens=prompt_tokens)
+                llm_prompt = await build_reduce_prompt(openai_client, ANALYSIS_MODEL, prompt_template, interview_info, transcript_array)
+            emit("stage", stage="prompting", prompt_tokens=estimate_tokens(llm_prompt))
+            if on_event is None:
+                response = await openai_client.chat.completions.create(
+                    model=ANALYSIS_MODEL,
+                    messages=[{"role": "user", "content": llm_prompt}],
+                    response_format={ "type": "json_object" },
+                    temperature=0.5
+                )
+                return response.choices[0].message.content
+
+            # Com streaming os tokens são repassados a quem acompanha a análise
+            stream = await openai_client.chat.completions.create(
+                model=ANALYSIS_MODEL,
+                messages=[{"role": "user", "content": llm_prompt}],
+                response_format={ "type": "json_object" },
+                temperature=0.5,
+                stream=True
+            )
+            parts = []
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    emit("token", delta=delta)
+            return "".join(parts)
+
+        try:
+            json_gerado = await asyncio.wait_for(
+                complete_analysis(),
+                timeout=120.0  # Timeout de 2 minutos (inclui a etapa de map)
+            )
+            gpt_time = time.time() - start_gpt
+            print(f"[TIMING] ⏱️  GPT-4o-mini levou: {gpt_time:.2f}s")
+            print(f"[DEBUG] ✅ Análise gerada com sucesso")
+        except asyncio.TimeoutError:
+            print(f"[ERROR] ❌ TIMEOUT ao gerar análise (>120s)")
+            raise HTTPException(status_code=504, detail="Timeout ao gerar análise. Tente novamente.")
+        except Exception as e:
+            print(f"[ERROR] ❌ Erro ao gerar análise: {e}")
+            raise HTTPException(status_code=500, detail=f"Erro ao gerar análise: {str(e)}")
     print(f"[DEBUG] 📄 JSON retornado pelo GPT (primeiros 500 chars): {json_gerado[:500]}...")
     
+    emit("stage", stage="validating")
     try:
         dictionary = json.loads(json_gerado)
     except json.JSONDecodeError as e:
-        conn.close()
         print(f"[ERROR] ❌ Erro ao fazer parse do JSON retornado pelo GPT: {e}")
         print(f"[ERROR] JSON completo: {json_gerado}")
         raise HTTPException(status_code=500, detail=f"Erro ao processar resposta do GPT: {str(e)}")
     
+    # Só respostas que são JSON válido entram no cache
+    if not cached:
+        save_cached_response(cache_key, ANALYSIS_MODEL, json_gerado)
+    
     # Validar campos obrigatórios e garantir que não estão vazios
     required_fields = ["summary", "positives", "negatives", "skills", "experiences", "score"]
     missing_fields = [field for field in required_fields if field not in dictionary]
@@ -319,16 +446,17 @@ async def generate_analysis(id: int):
     print(f"  - Experiences: {len(dictionary.get('experiences', []))} itens")
     print(f"  - Score overall: {dictionary.get('score', {}).get('overall', 0)}")
     
-    cursor.execute("UPDATE interviews SET analysis = ?, score = ? WHERE id = ?", (json_gerado, dictionary["score"]["overall"], id))
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        save_analysis(conn, id, json_gerado, dictionary["score"]["overall"])
+        conn.commit()
+    emit("stage", stage="saved")
     
     total_time = time.time() - start_total
     print(f"\n{'='*80}")
     print(f"[TIMING] ⏱️  TEMPO TOTAL: {total_time:.2f}s")
     print(f"{'='*80}\n")
     
-    return JSONResponse(content={"id": id, "analysis": dictionary, "message": "Resumo gerado e salvo com sucesso"})
+    return JSONResponse(content={"id": id, "analysis": dictionary, "cached": cached, "message": "Resumo gerado e salvo com sucesso"})
 
 @router.post("/{id}/upload-audio")
 async def upload_audio(id: int, audio: UploadFile = File(...), duration: str = None):
@@ -343,78 +471,76 @@ async def upload_audio(id: int, audio: UploadFile = File(...), duration: str = N
     print(f"{'='*80}")
     
     # Verificar se a entrevista existe
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM interviews WHERE id = ?", (id,))
-    row = cursor.fetchone()
+    with db_connection() as conn:
+        row = conn.execute("SELECT id FROM interviews WHERE id = ?", (id,)).fetchone()
     
     if not row:
-        conn.close()
         print(f"[ERROR] ❌ Interview {id} não encontrado")
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     try:
         # Criar diretório de uploads se não existir
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
         
         # Manter extensão original do arquivo (webm ou wav)
         original_extension = audio.filename.split('.')[-1] if '.' in audio.filename else 'webm'
         audio_filename = f"interview_{id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{original_extension}"
-        audio_path = os.path.join(upload_dir, audio_filename)
+        audio_path = os.path.join(UPLOAD_DIR, audio_filename)
         
-        # Salvar arquivo
+        # Salvar arquivo em blocos (memória constante)
         print(f"[DEBUG] 💾 Salvando áudio em: {audio_path}")
         start_save = time.time()
-        async with aiofiles.open(audio_path, 'wb') as f:
-            content = await audio.read()
-            await f.write(content)
+        file_size, checksum = await save_upload_file(audio, audio_path)
         save_time = time.time() - start_save
         
-        file_size = os.path.getsize(audio_path)
         file_size_mb = file_size / 1024 / 1024
         print(f"[TIMING] ⏱️  Salvamento levou: {save_time:.2f}s")
-        print(f"[DEBUG] ✅ Áudio salvo: {file_size_mb:.2f} MB ({file_size} bytes)")
+        print(f"[DEBUG] ✅ Áudio salvo: {file_size_mb:.2f} MB ({file_size} bytes), sha256={checksum}")
         print(f"[DEBUG] 📁 Formato: {original_extension.upper()}")
         
         # Atualizar banco de dados com o caminho do áudio e duração (se fornecida)
-        if duration:
-            try:
-                duration_float = float(duration)
-                cursor.execute(
-                    "UPDATE interviews SET audio_file = ?, date = ?, duration = ? WHERE id = ?",
-                    (audio_path, datetime.now().isoformat(), duration_float, id)
-                )
-                print(f"[DEBUG] 💾 Duração salva no banco: {duration_float}s")
-            except:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            if duration:
+                try:
+                    duration_float = float(duration)
+                    cursor.execute(
+                        "UPDATE interviews SET audio_file = ?, date = ?, duration = ? WHERE id = ?",
+                        (audio_path, datetime.now().isoformat(), duration_float, id)
+                    )
+                    print(f"[DEBUG] 💾 Duração salva no banco: {duration_float}s")
+                except:
+                    cursor.execute(
+                        "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?",
+                        (audio_path, datetime.now().isoformat(), id)
+                    )
+            else:
                 cursor.execute(
                     "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?",
                     (audio_path, datetime.now().isoformat(), id)
                 )
-        else:
-            cursor.execute(
-                "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?",
-                (audio_path, datetime.now().isoformat(), id)
-            )
-        
-        conn.commit()
-        conn.close()
+            
+            conn.commit()
         
         total_time = time.time() - start_time
         print(f"[TIMING] ⏱️  Upload total: {total_time:.2f}s")
         print(f"{'='*80}\n")
         
-        # Iniciar transcrição em background (não bloqueia a resposta)
-        print(f"[DEBUG] 🚀 Iniciando transcrição em background para interview {id}")
-        print(f"[DEBUG] 📤 Vai enviar para AssemblyAI em breve...")
-        asyncio.create_task(transcribe_audio_background(id, audio_path))
-        print(f"[DEBUG] ✅ Task de transcrição criada e rodando em background")
+        # Enfileirar transcrição em background (não bloqueia a resposta)
+        print(f"[DEBUG] 🚀 Enfileirando transcrição em background para interview {id}")
+        job_id = await asyncio.to_thread(
+            enqueue_job, "transcription", id, {"audio_path": audio_path},
+            idempotency_key=f"transcription:{id}:{audio_path}"
+        )
+        print(f"[DEBUG] ✅ Job de transcrição {job_id} enfileirado")
         
         # Retornar duração se foi fornecida
         response_data = {
             "message": "Áudio recebido e salvo com sucesso",
             "file_size": file_size,
-            "audio_path": audio_path
+            "sha256": checksum,
+            "audio_path": audio_path,
+            "job_id": job_id
         }
         
         if duration:
@@ -426,20 +552,272 @@ async def upload_audio(id: int, audio: UploadFile = File(...), duration: str = N
         
         return JSONResponse(content=response_data)
         
+    except UploadTooLargeError as e:
+        print(f"[ERROR] ❌ {e}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        conn.close()
         print(f"[ERROR] ❌ Erro ao salvar áudio: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao salvar áudio: {str(e)}")
 
+# ============================================
+# Upload retomável: iniciar, enviar blocos (PUT com offset), consultar offset, finalizar
+# ============================================
+
+_upload_locks = {}
+
+def _get_audio_upload(id: int, upload_id: str):
+    with db_connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM audio_uploads WHERE id = ? AND interview_id = ?", (upload_id, id)
+        ).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Upload não encontrado")
+    return row
+
+# Mensagem do 409 para uploads que não aceitam mais dados
+_UPLOAD_CLOSED_DETAIL = {
+    "finalized": "Upload já finalizado",
+    "aborted": "Upload cancelado",
+    "expired": "Upload expirado",
+}
+
+def _ensure_uploading(row):
+    if row["status"] != "uploading":
+        raise HTTPException(status_code=409, detail=_UPLOAD_CLOSED_DETAIL.get(row["status"], "Upload encerrado"))
+
+def _close_audio_upload(upload_id: str, status: str):
+    """Encerra um upload não finalizado (aborted/expired): apaga o .part e esquece o lock"""
+    with db_connection() as conn:
+        conn.execute("UPDATE audio_uploads SET status = ? WHERE id = ? AND status = 'uploading'", (status, upload_id))
+        conn.commit()
+    try:
+        os.remove(partial_upload_path(upload_id))
+    except FileNotFoundError:
+        pass
+    _upload_locks.pop(upload_id, None)
+
+def _audio_upload_status(row) -> dict:
+    return {
+        "upload_id": row["id"],
+        "interview_id": row["interview_id"],
+        "status": row["status"],
+        "offset": received_bytes(row["id"]) if row["status"] == "uploading" else row["total_size"],
+        "total_size": row["total_size"],
+        "audio_path": row["audio_path"],
+    }
+
+@router.post("/{id}/uploads")
+async def initiate_audio_upload(id: int, request: AudioUploadInitRequest):
+    """Inicia um upload retomável de áudio e retorna o upload_id"""
+    if request.total_size is not None and request.total_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Arquivo excede o tamanho máximo de {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+
+    upload_id = uuid.uuid4().hex
+    try:
+        with db_connection() as conn:
+            row = conn.execute("SELECT id FROM interviews WHERE id = ?", (id,)).fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+            conn.execute(
+                """
+                INSERT INTO audio_uploads (id, interview_id, filename, total_size, duration, status, created_at)
+                VALUES (?, ?, ?, ?, ?, 'uploading', ?)
+                """,
+                (upload_id, id, request.filename, request.total_size, request.duration, datetime.now().isoformat())
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao iniciar upload: {e}")
+
+    os.makedirs(PARTIAL_UPLOAD_DIR, exist_ok=True)
+    open(partial_upload_path(upload_id), 'wb').close()
+    print(f"[UPLOAD] 🆕 Upload retomável {upload_id} iniciado para interview {id} ({request.total_size} bytes)")
+
+    return JSONResponse(content={"upload_id": upload_id, "offset": 0, "total_size": request.total_size})
+
+@router.get("/{id}/uploads/{upload_id}")
+async def get_audio_upload_status(id: int, upload_id: str):
+    """Retorna quantos bytes do upload já foram recebidos (offset para retomar)"""
+    return JSONResponse(content=_audio_upload_status(_get_audio_upload(id, upload_id)))
+
+@router.put("/{id}/uploads/{upload_id}")
+async def upload_audio_chunk(id: int, upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """Anexa o corpo da requisição ao upload, a partir de `offset`"""
+    row = _get_audio_upload(id, upload_id)
+    _ensure_uploading(row)
+
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        # Um finalize (ou cancelamento) pode ter concluído enquanto esperávamos o lock
+        row = _get_audio_upload(id, upload_id)
+        _ensure_uploading(row)
+
+        current = received_bytes(upload_id)
+        if offset != current:
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Offset não confere com o recebido", "offset": current}
+            )
+
+        max_bytes = min(row["total_size"], MAX_UPLOAD_BYTES) if row["total_size"] else MAX_UPLOAD_BYTES
+        try:
+            written = await append_stream(request.stream(), partial_upload_path(upload_id), max_bytes)
+        except UploadTooLargeError as e:
+            if row["total_size"] and row["total_size"] < MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Dados excedem o tamanho declarado de {row['total_size']} bytes")
+            raise HTTPException(status_code=413, detail=str(e))
+
+    new_offset = current + written
+    return JSONResponse(content={"upload_id": upload_id, "offset": new_offset, "total_size": row["total_size"]})
+
+@router.delete("/{id}/uploads/{upload_id}")
+async def abort_audio_upload(id: int, upload_id: str):
+    """Cancela um upload retomável e apaga os dados já recebidos"""
+    row = _get_audio_upload(id, upload_id)
+    _ensure_uploading(row)
+
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        row = _get_audio_upload(id, upload_id)
+        _ensure_uploading(row)
+        _close_audio_upload(upload_id, "aborted")
+
+    print(f"[UPLOAD] 🗑️ Upload {upload_id} cancelado")
+    return JSONResponse(content=_audio_upload_status(_get_audio_upload(id, upload_id)))
+
+# Intervalo entre varreduras de uploads retomáveis abandonados
+PARTIAL_UPLOAD_SWEEP_INTERVAL_SECONDS = 3600
+
+def _last_upload_activity(row) -> float:
+    """Momento do último dado recebido (mtime do .part) ou da criação do upload"""
+    path = partial_upload_path(row["id"])
+    if os.path.exists(path):
+        return os.path.getmtime(path)
+    return datetime.fromisoformat(row["created_at"]).timestamp() if row["created_at"] else 0
+
+def expire_stale_uploads() -> int:
+    """Expira uploads sem dados novos há PARTIAL_UPLOAD_TTL_HOURS e apaga arquivos .part órfãos.
+
+    Roda no event loop (sem await), então não intercala com um PUT que esteja pegando o lock.
+    """
+    cutoff = time.time() - PARTIAL_UPLOAD_TTL_HOURS * 3600
+    with db_connection() as conn:
+        rows = conn.execute("SELECT id, created_at FROM audio_uploads WHERE status = 'uploading'").fetchall()
+    uploading = {row["id"] for row in rows}
+
+    expired = 0
+    for row in rows:
+        lock = _upload_locks.get(row["id"])
+        if (lock and lock.locked()) or _last_upload_activity(row) > cutoff:
+            continue
+        _close_audio_upload(row["id"], "expired")
+        expired += 1
+
+    if os.path.isdir(PARTIAL_UPLOAD_DIR):
+        for name in os.listdir(PARTIAL_UPLOAD_DIR):
+            upload_id, ext = os.path.splitext(name)
+            path = os.path.join(PARTIAL_UPLOAD_DIR, name)
+            if ext == ".part" and upload_id not in uploading and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                expired += 1
+
+    for upload_id in [key for key, lock in _upload_locks.items() if key not in uploading and not lock.locked()]:
+        _upload_locks.pop(upload_id, None)
+    return expired
+
+async def sweep_stale_uploads():
+    """Executa expire_stale_uploads no início e depois a cada PARTIAL_UPLOAD_SWEEP_INTERVAL_SECONDS"""
+    while True:
+        try:
+            expired = expire_stale_uploads()
+            if expired:
+                print(f"[UPLOAD] 🧹 {expired} upload(s) retomável(is) abandonado(s) removido(s)")
+        except (sqlite3.Error, OSError) as e:
+            print(f"[UPLOAD] ⚠️  Falha ao limpar uploads abandonados: {e}")
+        await asyncio.sleep(PARTIAL_UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+@router.post("/{id}/uploads/{upload_id}/finalize")
+async def finalize_audio_upload(id: int, upload_id: str, request: AudioUploadFinalizeRequest = None):
+    """Conclui o upload, move o áudio para uploads/ e enfileira a transcrição"""
+    row = _get_audio_upload(id, upload_id)
+    if row["status"] == "finalized":
+        return JSONResponse(content=_audio_upload_status(row))
+    _ensure_uploading(row)
+
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        # Outro finalize (ou um cancelamento) pode ter concluído enquanto esperávamos o lock
+        row = _get_audio_upload(id, upload_id)
+        if row["status"] == "finalized":
+            return JSONResponse(content=_audio_upload_status(row))
+        _ensure_uploading(row)
+
+        partial_path = partial_upload_path(upload_id)
+        size = received_bytes(upload_id)
+        if row["total_size"] is not None and size != row["total_size"]:
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Upload incompleto", "offset": size, "total_size": row["total_size"]}
+            )
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Nenhum dado recebido")
+
+        checksum = await sha256_file(partial_path)
+        if request and request.sha256 and request.sha256.lower() != checksum:
+            raise HTTPException(status_code=422, detail="Checksum SHA-256 não confere")
+
+        filename = row["filename"] or ""
+        extension = filename.split('.')[-1] if '.' in filename else 'webm'
+        audio_path = os.path.join(UPLOAD_DIR, f"interview_{id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
+
+        # O arquivo só é movido dentro da transação e volta para o .part se o commit falhar,
+        # então banco e disco não ficam divergentes
+        try:
+            with db_connection() as conn:
+                if row["duration"] is not None:
+                    conn.execute(
+                        "UPDATE interviews SET audio_file = ?, date = ?, duration = ? WHERE id = ?",
+                        (audio_path, datetime.now().isoformat(), row["duration"], id)
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?",
+                        (audio_path, datetime.now().isoformat(), id)
+                    )
+                conn.execute(
+                    "UPDATE audio_uploads SET status = 'finalized', total_size = ?, audio_path = ? WHERE id = ?",
+                    (size, audio_path, upload_id)
+                )
+                os.replace(partial_path, audio_path)
+                try:
+                    conn.commit()
+                except sqlite3.Error:
+                    os.replace(audio_path, partial_path)
+                    raise
+        except sqlite3.Error as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao finalizar upload: {e}")
+
+    _upload_locks.pop(upload_id, None)
+    print(f"[UPLOAD] ✅ Upload {upload_id} finalizado: {audio_path} ({size} bytes), sha256={checksum}")
+
+    job_id = await asyncio.to_thread(
+        enqueue_job, "transcription", id, {"audio_path": audio_path},
+        idempotency_key=f"transcription:{id}:{audio_path}"
+    )
+
+    return JSONResponse(content={
+        "message": "Áudio recebido e salvo com sucesso",
+        "upload_id": upload_id,
+        "file_size": size,
+        "sha256": checksum,
+        "audio_path": audio_path,
+        "duration": row["duration"],
+        "job_id": job_id
+    })
+
 with open("prompts/prompt_questions.txt", "r") as f:
     original_prompt_template = f.read()
 
-def get_utterances_last_n_seconds(data, n_seconds):
-    if not data.get("utterances"):
-        return []
-    cutoff_time = max(utt["end"] for utt in data["utterances"]) - n_seconds
-    return [utt for utt in data["utterances"] if utt["end"] >= cutoff_time]
-
 def append_transcript_to_prompt(prompt, utterances):
     transcript_text = "\n".join(
         [f"Speaker {utt['speaker']}: {utt['text']}" for utt in utterances]
@@ -447,17 +825,17 @@ def append_transcript_to_prompt(prompt, utterances):
     return prompt + "\n\n" + transcript_text
 
 async def save_transcript_to_db(id: int, transcript_data: dict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    transcript_json_text = json.dumps(transcript_data)
-    cursor.execute(
-        "UPDATE interviews SET transcript = ? WHERE id = ?", (transcript_json_text, id)
-    )
-    conn.commit()
-    conn.close()
+    transcript_json_text = dump_transcript(transcript_data["utterances"])
+    with db_connection() as conn:
+        save_transcript(conn, id, transcript_json_text)
+        conn.commit()
+    notify_transcript_saved(id)
 
 async def transcribe_audio_background(interview_id: int, audio_path: str):
-    """Transcreve áudio em background após upload com diarização completa"""
+    """Transcreve áudio em background após upload com diarização completa.
+
+    Executado pelo worker de jobs; falhas são propagadas para que o job seja tentado novamente.
+    """
     try:
         print(f"\n{'='*80}")
         print(f"[DEBUG] 🎙️ Iniciando transcrição COMPLETA em background para interview {interview_id}")
@@ -469,23 +847,17 @@ async def transcribe_audio_background(interview_id: int, audio_path: str):
         
         if not os.path.exists(audio_path):
             print(f"[DEBUG] ⚠️ Arquivo de áudio não encontrado: {audio_path}")
-            return
+            raise FileNotFoundError(f"Arquivo de áudio não encontrado: {audio_path}")
         
         file_size_mb = os.path.getsize(audio_path) / 1024 / 1024
         print(f"[DEBUG] 📁 Tamanho do arquivo: {file_size_mb:.2f} MB")
         print(f"[DEBUG] 📤 Enviando para AssemblyAI com diarização (speakers=2)...")
         print(f"[DEBUG] 🔗 Conectando ao AssemblyAI...")
         
-        config = aai.TranscriptionConfig(
-            language_code="pt",
-            speaker_labels=True,
-            speakers_expected=2,
-        )
-        
         import time
         start_time = time.time()
         print(f"[DEBUG] ✅ Enviando requisição para AssemblyAI agora...")
-        transcript = aai.Transcriber(config=config).transcribe(audio_path)
+        transcript = await transcribe_file(audio_path)
         transcription_time = time.time() - start_time
         
         print(f"[DEBUG] ⏱️  Transcrição levou {transcription_time:.2f}s")
@@ -493,33 +865,13 @@ async def transcribe_audio_background(interview_id: int, audio_path: str):
         
         if transcript.status == "error":
             print(f"[BACKGROUND] ❌ Erro na transcrição: {transcript.error}")
-            return
+            raise RuntimeError(f"Erro na transcrição: {transcript.error}")
         
         if transcript.status == "completed" and transcript.utterances:
             print(f"[BACKGROUND] ✅ Transcrição completa com {len(transcript.utterances)} utterances")
             
-            utt_list = []
-            speakers_found = set()
-            
-            for utt in transcript.utterances:
-                # Converter speaker para formato consistente (A, B, C...)
-                speaker = utt.speaker
-                if isinstance(speaker, (int, float)):
-                    speaker = chr(65 + int(speaker))
-                elif isinstance(speaker, str):
-                    speaker = speaker.upper()
-                else:
-                    speaker = "A"
-                
-                speakers_found.add(speaker)
-                
-                utt_dict = {
-                    "speaker": speaker,
-                    "text": utt.text,
-                    "start": utt.start,
-                    "end": utt.end
-                }
-                utt_list.append(utt_dict)
+            utt_list = utterances_to_dicts(transcript.utterances)
+            speakers_found = set(utt["speaker"] for utt in utt_list)
             
             print(f"[BACKGROUND] 👥 Speakers identificados: {sorted(speakers_found)}")
             print(f"[BACKGROUND] 📊 Total de utterances: {len(utt_list)}")
@@ -531,23 +883,15 @@ async def transcribe_audio_background(interview_id: int, audio_path: str):
                 print(f"[BACKGROUND] ⚠️  Speakers encontrados: {speakers_found}")
             
             # Salvar no banco - SUBSTITUI a transcrição em tempo real
-            transcript_data = {"utterances": utt_list}
-            transcript_json = json.dumps(transcript_data)
-            
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # IMPORTANTE: Antes de salvar, verificar se já existe transcrição
-            cursor.execute("SELECT transcript FROM interviews WHERE id = ?", (interview_id,))
-            row = cursor.fetchone()
-            old_transcript = row["transcript"] if row else None
+            transcript_json = dump_transcript(utt_list)
             
-            cursor.execute(
-                "UPDATE interviews SET transcript = ? WHERE id = ?", 
-                (transcript_json, interview_id)
-            )
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                # IMPORTANTE: Antes de salvar, verificar se já existe transcrição
+                old_transcript = get_transcript(conn, interview_id)
+                
+                save_transcript(conn, interview_id, transcript_json)
+                conn.commit()
+            notify_transcript_saved(interview_id)
             
             print(f"\n{'='*80}")
             print(f"[BACKGROUND] 💾 ✅ Transcrição DEFINITIVA COM DIARIZAÇÃO salva no banco!")
@@ -557,9 +901,8 @@ async def transcribe_audio_background(interview_id: int, audio_path: str):
             print(f"[BACKGROUND] 📊 Utterances: {len(utt_list)}")
             if old_transcript:
                 try:
-                    old_data = json.loads(old_transcript)
-                    old_utts = old_data.get("utterances", []) if isinstance(old_data, dict) else old_data
-                    print(f"[BACKGROUND] 📉 Utterances antigas (tempo real): {len(old_utts) if isinstance(old_utts, list) else 'N/A'}")
+                    old_utts = load_transcript(old_transcript)
+                    print(f"[BACKGROUND] 📉 Utterances antigas (tempo real): {len(old_utts)}")
                 except:
                     pass
             print(f"{'='*80}\n")
@@ -569,143 +912,54 @@ async def transcribe_audio_background(interview_id: int, audio_path: str):
             
     except Exception as e:
         print(f"[BACKGROUND] ❌ Erro na transcrição em background: {e}")
-        import traceback
-        traceback.print_exc()
+        raise
 
-def convert_pcm_to_wav(pcm_path: str, wav_path: str, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2):
-    """Converte arquivo PCM para WAV adicionando o header completo"""
-    if not os.path.exists(pcm_path) or os.path.getsize(pcm_path) == 0:
-        print(f"[PCM2WAV] ❌ Arquivo PCM não existe ou está vazio: {pcm_path}")
-        return False
-    
-    try:
-        print(f"[PCM2WAV] 🔄 Convertendo {pcm_path} → {wav_path}")
-        
-        with open(pcm_path, 'rb') as pcm_file:
-            pcm_data = pcm_file.read()
-        
-        # Calcular tamanhos
-        data_size = len(pcm_data)
-        file_size = 36 + data_size
-        
-        print(f"[PCM2WAV] 📊 PCM data size: {data_size} bytes")
-        print(f"[PCM2WAV] 📊 WAV file size: {file_size} bytes")
-        print(f"[PCM2WAV] 🎵 Sample rate: {sample_rate}Hz, Channels: {channels}, Bit depth: {sample_width * 8}")
-        
-        # Criar header WAV completo
-        with open(wav_path, 'wb') as wav_file:
-            # RIFF header
-            wav_file.write(b'RIFF')
-            wav_file.write(struct.pack('<I', file_size))
-            wav_file.write(b'WAVE')
-            
-            # fmt chunk (formato do áudio)
-            wav_file.write(b'fmt ')
-            wav_file.write(struct.pack('<I', 16))  # fmt chunk size (16 para PCM)
-            wav_file.write(struct.pack('<H', 1))   # audio format (1 = PCM)
-            wav_file.write(struct.pack('<H', channels))  # número de canais
-            wav_file.write(struct.pack('<I', sample_rate))  # sample rate
-            wav_file.write(struct.pack('<I', sample_rate * channels * sample_width))  # byte rate
-            wav_file.write(struct.pack('<H', channels * sample_width))  # block align
-            wav_file.write(struct.pack('<H', sample_width * 8))  # bits per sample
-            
-            # data chunk (dados de áudio)
-            wav_file.write(b'data')
-            wav_file.write(struct.pack('<I', data_size))
-            wav_file.write(pcm_data)
-        
-        # Verificar se foi criado com sucesso
-        if os.path.exists(wav_path):
-            wav_size = os.path.getsize(wav_path)
-            duration_seconds = data_size / (sample_rate * channels * sample_width)
-            print(f"[PCM2WAV] ✅ WAV criado: {wav_size} bytes")
-            print(f"[PCM2WAV] ⏱️  Duração estimada: {duration_seconds:.2f}s")
-            return True
-        else:
-            print(f"[PCM2WAV] ❌ Arquivo WAV não foi criado")
-            return False
-            
-    except Exception as e:
-        print(f"[PCM2WAV] ❌ Erro ao converter PCM para WAV: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+register_job_handler("transcription", transcribe_audio_background)
+register_job_handler(
+    "analysis", run_analysis,
+    concurrency=ANALYSIS_JOB_CONCURRENCY, rate_per_minute=ANALYSIS_JOB_RATE_PER_MINUTE
+)
 
 @router.post("/{id}/transcribe_audio_file")
 async def transcribe_audio_file(id: int):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,))
-    row = cursor.fetchone()
+    with db_connection() as conn:
+        row = conn.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,)).fetchone()
     if not row or not row["audio_file"]:
-        conn.close()
         raise HTTPException(status_code=404, detail="Audio file not found for this interview")
 
     audio_path = row["audio_file"]
     print(f"[DEBUG] Audio path: {audio_path}")
 
     if not os.path.exists(audio_path):
-        conn.close()
         raise HTTPException(status_code=404, detail="Audio file not found on server")
 
     try:
         print(f"[DEBUG] Starting transcription for interview {id}")
-        config = aai.TranscriptionConfig(
-            language_code="pt",
-            speaker_labels=True,
-            speakers_expected=2,
-        )
-
         print("[DEBUG] Sending to AssemblyAI...")
-        transcript = aai.Transcriber(config=config).transcribe(audio_path)
+        transcript = await transcribe_file(audio_path)
         print(f"[DEBUG] Transcription status: {transcript.status}")
 
         if transcript.status == "error":
             raise HTTPException(status_code=500, detail=f"Transcription failed: {transcript.error}")
 
-        utt_list = []
-        for utt in transcript.utterances:
-            # Converter speaker para formato consistente (A, B, C...)
-            # AssemblyAI pode retornar como string "A", "B" ou como número 0, 1
-            speaker = utt.speaker
-            if isinstance(speaker, (int, float)):
-                # Converter número para letra: 0 -> A, 1 -> B, etc.
-                speaker = chr(65 + int(speaker))  # 65 é o código ASCII de 'A'
-            elif isinstance(speaker, str):
-                speaker = speaker.upper()
-            else:
-                speaker = "A"  # Fallback
-            
-            print(f"[DEBUG] Speaker original: {utt.speaker}, convertido: {speaker}")
-            
-            utt_dict = {
-                "speaker": speaker,
-                "text": utt.text,
-                "start": utt.start,
-                "end": utt.end
-            }
-            utt_list.append(utt_dict)
-
-        transcript_json = json.dumps(utt_list)
-
-        cursor.execute(
-            "UPDATE interviews SET transcript = ? WHERE id = ?", (transcript_json, id)
-        )
-        conn.commit()
+        utt_list = utterances_to_dicts(transcript.utterances)
+
+        transcript_json = dump_transcript(utt_list)
+
+        with db_connection() as conn:
+            save_transcript(conn, id, transcript_json)
+            conn.commit()
+        notify_transcript_saved(id)
 
     except HTTPException:
-        conn.close()
         raise
     except Exception as e:
-        conn.close()
         print(f"[ERROR] Exception type: {type(e).__name__}")
         print(f"[ERROR] Exception message: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
-    conn.close()
     return JSONResponse(content={"id": id, "message": "Audio transcribed and transcript saved successfully", "transcript": utt_list})
 
 @router.websocket("/ws/transcribe")
@@ -713,7 +967,17 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
     await websocket.accept()
     print(f"[DEBUG] 🔌 WebSocket aceito para interview ID: {id}")
 
-    transcript_data = {"utterances": []}
+    # Falas finalizadas, em janela deslizante (memória limitada em sessões longas)
+    session_transcript = SessionTranscript()
+    # Falas ainda em andamento: {turn_id: {"speaker", "text", "start", "end"}}
+    active_utterances = {}
+
+    # Timestamps das falas em ms desde o início da sessão (relógio de parede, não mais 0 fixo)
+    session_clock = asyncio.get_running_loop().time
+    session_started = session_clock()
+
+    def session_ms() -> int:
+        return int((session_clock() - session_started) * 1000)
 
     date = datetime.now().isoformat()
     audio_filename = f"interview_{id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.wav"
@@ -721,7 +985,8 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
     os.makedirs(upload_dir, exist_ok=True)
     audio_path = os.path.join(upload_dir, audio_filename)
 
-    audio_file = await aiofiles.open(audio_path, 'wb')
+    # WAV gravado em streaming: header provisório agora, tamanhos corrigidos no close()
+    audio_file = await StreamingWavWriter(audio_path).open()
 
     config = aai.TranscriptionConfig(
             language_code="pt",
@@ -756,6 +1021,9 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                 pass
         streaming_client = None
 
+    # Fila entre o navegador e os consumidores (disco + AssemblyAI v3)
+    relay = AudioRelay(audio_file, streaming_client.send if streaming_client else None).start()
+
     try:
         stop_event = asyncio.Event()
 
@@ -767,10 +1035,8 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                     chunk_count += 1
                     if chunk_count % 100 == 0:  # Log a cada 100 chunks
                         print(f"[DEBUG] 📥 Recebido {len(audio_chunk)} bytes do frontend (chunk #{chunk_count})")
-                    await audio_file.write(audio_chunk)
-                    if streaming_client:
-                        # Enviar áudio binário para AssemblyAI v3
-                        await streaming_client.send(audio_chunk)
+                    # Disco e AssemblyAI são consumidos em paralelo pelo relay
+                    await relay.put(audio_chunk)
                 except WebSocketDisconnect:
                     print("[DEBUG] WebSocket desconectado em send_audio")
                     stop_event.set()
@@ -778,6 +1044,7 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                 except Exception as e:
                     print(f"[ERROR] Erro em send_audio: {e}")
                     break
+            await relay.close()
 
         async def receive_transcripts():
             if not streaming_client:
@@ -790,56 +1057,67 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
             # Rastrear último turn ativo por speaker para agrupar atualizações
             last_active_turn = {}  # {speaker: turn_id}
             turn_counter = {}  # {speaker: counter} para gerar IDs únicos
-            finalize_timers = {}  # {speaker: asyncio.Task} para timers de finalização
             last_text = {}  # {turn_id: texto_anterior} para calcular diff
             
-            async def finalize_turn(speaker, turn_id, delay=4.0):
-                """Finaliza um turn após X segundos de silêncio"""
+            async def send_transcript_update(payload):
+                if not stop_event.is_set():
+                    await websocket.send_json(payload)
+            
+            transcript_updates = TranscriptUpdateBuffer(send_transcript_update)
+            
+            def record_final_utterance(speaker, turn_id):
+                """Move o turn para session_transcript com os timestamps da sessão"""
+                utterance = active_utterances.pop(turn_id, None)
+                if turn_id not in last_text:
+                    return
+                final_text = last_text[turn_id]
+                session_transcript.append({
+                    "speaker": speaker,
+                    "text": final_text,
+                    "start": utterance["start"] if utterance else session_ms(),
+                    "end": utterance["end"] if utterance else session_ms()
+                })
+                question_trigger.on_turn_finalized(final_text)
+            
+            async def finalize_turn(speaker, turn_id):
+                """Finaliza um turn após TURN_SILENCE_SECONDS de silêncio"""
+                # Verificar se o WebSocket ainda está aberto antes de enviar
+                if stop_event.is_set():
+                    print(f"[DEBUG] WebSocket fechado, cancelando finalização do turn {turn_id}")
+                    return
+                
+                # Após o silêncio, marcar como final e salvar no session_transcript
+                print(f"[DEBUG] Finalizando turn {turn_id} do speaker {speaker} após {TURN_SILENCE_SECONDS}s de silêncio")
+                
+                # Salvar no session_transcript
+                record_final_utterance(speaker, turn_id)
+                
+                # Enviar mensagem de finalização apenas se WebSocket ainda estiver aberto
                 try:
-                    await asyncio.sleep(delay)
-                    
-                    # Verificar se o WebSocket ainda está aberto antes de enviar
-                    if stop_event.is_set():
-                        print(f"[DEBUG] WebSocket fechado, cancelando finalização do turn {turn_id}")
-                        return
-                    
-                    # Após 4 segundos, marcar como final e salvar no transcript_data
-                    print(f"[DEBUG] Finalizando turn {turn_id} do speaker {speaker} após {delay}s de silêncio")
-                    
-                    # Salvar no transcript_data
-                    if turn_id in last_text:
-                        final_text = last_text[turn_id]
-                        transcript_data["utterances"].append({
-                            "speaker": speaker,
-                            "text": final_text,
-                            "start": 0,  # Será atualizado se necessário
-                            "end": 0
+                    # Verificar se o WebSocket ainda está conectado
+                    if not stop_event.is_set():
+                        # Parciais pendentes do turn precisam chegar antes da finalização
+                        await transcript_updates.flush()
+                        await websocket.send_json({
+                            "transcript_finalize": {
+                                "id": turn_id,
+                                "speaker": speaker
+                            }
                         })
-                    
-                    # Enviar mensagem de finalização apenas se WebSocket ainda estiver aberto
-                    try:
-                        # Verificar se o WebSocket ainda está conectado
-                        if not stop_event.is_set():
-                            await websocket.send_json({
-                                "transcript_finalize": {
-                                    "id": turn_id,
-                                    "speaker": speaker
-                                }
-                            })
-                    except Exception as e:
-                        print(f"[DEBUG] WebSocket já fechado ao tentar finalizar turn {turn_id}: {e}")
-                    
-                    # Limpar do active turns para forçar criação de novo ID na próxima frase
-                    if speaker in last_active_turn:
-                        del last_active_turn[speaker]
-                    if turn_id in last_text:
-                        del last_text[turn_id]
-                except asyncio.CancelledError:
-                    # Timer foi cancelado (nova palavra chegou antes de 4s)
-                    print(f"[DEBUG] Timer cancelado para turn {turn_id} - pessoa voltou a falar")
-                    pass
                 except Exception as e:
-                    print(f"[ERROR] Erro em finalize_turn para turn {turn_id}: {e}")
+                    print(f"[DEBUG] WebSocket já fechado ao tentar finalizar turn {turn_id}: {e}")
+                
+                # Limpar do active turns para forçar criação de novo ID na próxima frase
+                if last_active_turn.get(speaker) == turn_id:
+                    del last_active_turn[speaker]
+                if turn_id in last_text:
+                    del last_text[turn_id]
+            
+            # Um único scheduler por sessão: cada parcial só renova o prazo do speaker
+            finalize_timers = DeadlineScheduler(finalize_turn)
+            finalize_timers_task = asyncio.create_task(finalize_timers.run())
+            # transcript_update mesclados por turn e enviados em lote
+            updates_task = asyncio.create_task(transcript_updates.run())
             
             message_count = 0
             try:
@@ -867,9 +1145,6 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                             text = str(text).strip()
                             
                             if text:
-                                # Debug: log da mensagem completa recebida
-                                print(f"[DEBUG] {msg_type} recebido - Text: '{text[:50]}...'")
-                                
                                 # Tentar obter speaker de diferentes campos
                                 speaker = data.get("speaker") or data.get("speaker_label") or data.get("speaker_id") or "A"
                                 if isinstance(speaker, (int, float)):
@@ -879,10 +1154,6 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                                 else:
                                     speaker = "A"
                                 
-                                # Timestamps (v3 usa created timestamp)
-                                start = 0
-                                end = 0
-                                
                                 # Verificar se é continuação da frase anterior ou nova frase
                                 is_new_turn = False
                                 turn_id = None
@@ -903,16 +1174,11 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                                     if speaker in last_active_turn:
                                         old_turn_id = last_active_turn[speaker]
                                         if old_turn_id in last_text:
-                                            final_text = last_text[old_turn_id]
-                                            transcript_data["utterances"].append({
-                                                "speaker": speaker,
-                                                "text": final_text,
-                                                "start": 0,
-                                                "end": 0
-                                            })
+                                            record_final_utterance(speaker, old_turn_id)
                                             # Enviar finalização da frase anterior
                                             try:
                                                 if not stop_event.is_set():
+                                                    await transcript_updates.flush()
                                                     await websocket.send_json({
                                                         "transcript_finalize": {
                                                             "id": old_turn_id,
@@ -930,42 +1196,43 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                                     turn_id = f"{speaker}_{turn_counter[speaker]}"
                                     last_active_turn[speaker] = turn_id
                                     last_text[turn_id] = ""
+                                    active_utterances[turn_id] = {
+                                        "speaker": speaker,
+                                        "text": "",
+                                        "start": session_ms(),
+                                        "end": session_ms()
+                                    }
                                     print(f"[DEBUG] Criando nova frase: {turn_id}")
                                 
-                                # Cancelar timer anterior deste speaker (se existir)
-                                if speaker in finalize_timers:
-                                    finalize_timers[speaker].cancel()
-                                
-                                # Criar novo timer de 4 segundos para finalizar
-                                finalize_timers[speaker] = asyncio.create_task(
-                                    finalize_turn(speaker, turn_id, delay=4.0)
-                                )
+                                # Renovar o prazo de finalização deste speaker
+                                finalize_timers.schedule(speaker, TURN_SILENCE_SECONDS, turn_id)
                                 
                                 # Calcular apenas as palavras novas (diff)
                                 previous_text = last_text.get(turn_id, "")
                                 new_words = text[len(previous_text):] if text.startswith(previous_text) else text
                                 last_text[turn_id] = text
                                 
-                                # Debug: log do speaker recebido
-                                print(f"[DEBUG] Turn parcial - Speaker: {speaker}, ID: {turn_id}, New words: '{new_words}'")
+                                utterance = active_utterances.setdefault(
+                                    turn_id, {"speaker": speaker, "start": session_ms()}
+                                )
+                                utterance["text"] = text
+                                utterance["end"] = session_ms()
+                                question_trigger.on_new_words(new_words)
                                 
                                 utt_dict = {
                                     "id": turn_id,
                                     "speaker": speaker,
                                     "text": text,  # Texto completo (para referência)
                                     "new_words": new_words,  # Apenas palavras novas
-                                    "start": start,
-                                    "end": end,
+                                    "start": utterance["start"],
+                                    "end": utterance["end"],
                                     "is_final": False
                                 }
                                 
-                                # Enviar atualização parcial para o frontend
-                                print(f"[DEBUG] 📤 Enviando para frontend: '{new_words[:30]}...'")
+                                # Atualização parcial vai para o buffer da sessão (envio em lote)
                                 try:
                                     if not stop_event.is_set():
-                                        await websocket.send_json({"transcript_update": [utt_dict]})
-                                    else:
-                                        print(f"[DEBUG] WebSocket fechado, não enviando transcript_update")
+                                        await transcript_updates.add(utt_dict)
                                 except Exception as e:
                                     print(f"[DEBUG] WebSocket fechado ao enviar transcript_update: {e}")
                         elif msg_type == "FinalTranscript" or msg_type == "Termination":
@@ -995,30 +1262,44 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
                 print(f"[ERROR] Erro no loop de recebimento de transcrições: {e}")
                 import traceback
                 traceback.print_exc()
+            finally:
+                finalize_timers_task.cancel()
+                updates_task.cancel()
+                print(f"[DEBUG] 📤 transcript_update: {transcript_updates.updates_received} parciais em {transcript_updates.messages_sent} mensagens")
 
-        async def periodic_gpt_analysis():
-            while not stop_event.is_set():
-                await asyncio.sleep(40)
-                last_utts = get_utterances_last_n_seconds(transcript_data, 50)
-                if not last_utts:
-                    continue
-                prompt_to_send = append_transcript_to_prompt(original_prompt_template, last_utts)
-                response = await openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "user", "content": prompt_to_send},
-                    ],
-                    response_format={ "type": "json_object" },
-                    max_tokens=200,
-                    temperature=0.5
-                )
-                gpt_message = response.choices[0].message.content.strip()
+        async def generate_question_suggestions():
+            # Falas finalizadas + as que ainda estão em andamento, em ordem de início
+            last_utts = session_transcript.last_n_seconds(SUGGESTION_WINDOW_SECONDS, active_utterances.values())
+            if not last_utts:
+                return
+            print(f"[SUGGESTIONS] 💡 Gerando sugestões com {len(last_utts)} fala(s) dos últimos {SUGGESTION_WINDOW_SECONDS}s")
+            prompt_to_send = append_transcript_to_prompt(original_prompt_template, last_utts)
+            response = await openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "user", "content": prompt_to_send},
+                ],
+                response_format={ "type": "json_object" },
+                max_tokens=200,
+                temperature=0.5
+            )
+            gpt_message = response.choices[0].message.content.strip()
+            if not stop_event.is_set():
                 await websocket.send_json({"gpt_response": gpt_message})
 
+        # Sugestões disparadas por falas finalizadas / palavras novas, não mais a cada 40s
+        question_trigger = SuggestionTrigger(generate_question_suggestions)
+
+        async def question_suggestions():
+            trigger_task = asyncio.create_task(question_trigger.run())
+            await stop_event.wait()
+            trigger_task.cancel()
+            print(f"[SUGGESTIONS] 📊 {question_trigger.calls} chamada(s) ao LLM, {question_trigger.skipped} gatilho(s) sem conteúdo novo")
+
         await asyncio.gather(
             send_audio(),
             receive_transcripts(),
-            periodic_gpt_analysis()
+            question_suggestions()
         )
 
     except WebSocketDisconnect:
@@ -1060,6 +1341,7 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
             except:
                 pass
     finally:
+        await relay.close()
         # Garantir que a conexão seja fechada no finally também
         if streaming_client:
             try:
@@ -1072,42 +1354,32 @@ async def websocket_transcribe(websocket: WebSocket, id: int = Query(...)):
         print(f"[WEBSOCKET] 🧹 Limpeza final do WebSocket para interview {id}")
         print(f"{'='*80}")
         
-        # Converter PCM para WAV para compatibilidade com player de áudio
-        if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-            wav_path = audio_path.replace('.wav', '_final.wav')
-            if convert_pcm_to_wav(audio_path, wav_path):
-                # Substituir arquivo PCM por WAV
-                try:
-                    os.replace(wav_path, audio_path)
-                    print(f"[WEBSOCKET] ✅ Áudio convertido PCM → WAV: {audio_path}")
-                except Exception as e:
-                    print(f"[WEBSOCKET] ⚠️ Error replacing PCM with WAV: {e}")
-        
+        if audio_file.data_size > 0:
+            print(f"[WEBSOCKET] ✅ Áudio WAV salvo: {audio_path} ({audio_file.data_size} bytes PCM, {audio_file.duration:.2f}s)")
+
         # ❌ REMOVIDO: Não salvar transcrição em tempo real
         # A transcrição será feita APENAS pelo background task COM diarização
         # Salvar aqui causa race condition e sobrescreve a transcrição com diarização
         
-        print(f"[WEBSOCKET] ❌ NÃO salvando transcrição em tempo real ({len(transcript_data['utterances'])} utterances)")
+        print(f"[WEBSOCKET] ❌ NÃO salvando transcrição em tempo real ({session_transcript.total} utterances)")
         print(f"[WEBSOCKET] 📝 Aguardando transcrição COM DIARIZAÇÃO do background task")
         print(f"{'='*80}\n")
         
         # Atualizar apenas o audio_file no banco (se ainda não foi atualizado pelo upload)
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Verificar se audio_file já foi setado pelo endpoint de upload
-        cursor.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,))
-        row = cursor.fetchone()
-        
-        if not row or not row["audio_file"]:
-            # Só atualizar se ainda não foi setado pelo upload
-            cursor.execute(
-                "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?", 
-                (audio_path, date, id)
-            )
-            conn.commit()
-            print(f"[WEBSOCKET] 💾 Audio file path salvo no banco: {audio_path}")
-        else:
-            print(f"[WEBSOCKET] ℹ️  Audio file já foi salvo pelo endpoint de upload")
-        
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Verificar se audio_file já foi setado pelo endpoint de upload
+            cursor.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,))
+            row = cursor.fetchone()
+            
+            if not row or not row["audio_file"]:
+                # Só atualizar se ainda não foi setado pelo upload
+                cursor.execute(
+                    "UPDATE interviews SET audio_file = ?, date = ? WHERE id = ?", 
+                    (audio_path, date, id)
+                )
+                conn.commit()
+                print(f"[WEBSOCKET] 💾 Audio file path salvo no banco: {audio_path}")
+            else:
+                print(f"[WEBSOCKET] ℹ️  Audio file já foi salvo pelo endpoint de upload")
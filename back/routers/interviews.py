@@ -1,40 +1,65 @@
 import json
 import sqlite3
 import os
-import mimetypes
 import asyncio
+import mimetypes
 from datetime import datetime
 from models import InterviewCreateRequest, QuestionCreateRequest, NotesUpdateRequest
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
 from fastapi.responses import JSONResponse, FileResponse
-from database import get_db_connection
+from database import db_connection
+from interview_store import (
+    TRANSCRIPT_JOIN, ANALYSIS_JOIN, decode_stored_safe, get_transcript, get_analysis, index_interview, search_interviews
+)
+from jobs import enqueue_job
+from uploads import UPLOAD_DIR, UploadTooLargeError, save_upload_file
+from transcript_codec import load_transcript
+from pagination import encode_cursor, decode_cursor, fetch_keyset_page
 
 router = APIRouter(
     prefix="/positions/interviews",
     tags=["Interviews"]
 )
 
+def parse_json_column(interview_id: int, column: str, value):
+    """Faz o parse seguro de uma coluna JSON (transcript/analysis), retornando '' se inválida"""
+    if not value:
+        return ""
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        print(f"[WARNING] Erro ao parsear {column} da entrevista {interview_id}, usando string vazia")
+        return ""
+
+def parse_transcript_column(interview_id: int, value):
+    """Decodifica o transcript salvo (JSON ou formato compacto) como {"utterances": [...]}, ou '' se inválido"""
+    if not value:
+        return ""
+    try:
+        return {"utterances": load_transcript(value)}
+    except (ValueError, TypeError):
+        print(f"[WARNING] Erro ao parsear transcript da entrevista {interview_id}, usando string vazia")
+        return ""
+
 @router.post("/candidate")
 def insert_interview(request: InterviewCreateRequest):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO interviews (
-                name,
-                email,
-                number,
-                notes,
-                transcript,
-                analysis,
-                score,
-                position_id
-            )
-            VALUES (?, ?, ?, ?, '', '', '', ?)
-        """, (request.name, request.email, request.number, request.notes or '', request.position_id))
-        conn.commit()
-        row_id = cursor.lastrowid
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO interviews (
+                    name,
+                    email,
+                    number,
+                    notes,
+                    score,
+                    position_id
+                )
+                VALUES (?, ?, ?, ?, '', ?)
+            """, (request.name, request.email, request.number, request.notes or '', request.position_id))
+            row_id = cursor.lastrowid
+            index_interview(conn, row_id)
+            conn.commit()
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inserir candidato no banco de dados: {e}")
 
@@ -53,70 +78,62 @@ async def insert_interview_audio(id: int, audio: UploadFile = File(...)):
     print(f"{'='*80}")
     
     # Verificar se a entrevista existe
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM interviews WHERE id = ?", (id,))
-    row = cursor.fetchone()
+    with db_connection() as conn:
+        row = conn.execute("SELECT id FROM interviews WHERE id = ?", (id,)).fetchone()
     
     if not row:
-        conn.close()
         print(f"[ERROR] ❌ Interview {id} não encontrado")
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     try:
-        os.makedirs("uploads", exist_ok=True)
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
 
         date = datetime.now().isoformat()
         base_filename, ext = os.path.splitext(audio.filename)
         safe_filename = f"interview_{id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
-        audio_file = f"uploads/{safe_filename}"
+        audio_file = f"{UPLOAD_DIR}/{safe_filename}"
         
         print(f"[DEBUG] 💾 Salvando áudio em: {audio_file}")
         start_save = time.time()
         
-        with open(audio_file, "wb") as f:
-            content = await audio.read()
-            f.write(content)
+        file_size, checksum = await save_upload_file(audio, audio_file)
         
         save_time = time.time() - start_save
-        file_size = os.path.getsize(audio_file)
         file_size_mb = file_size / 1024 / 1024
         
         print(f"[TIMING] ⏱️  Salvamento levou: {save_time:.2f}s")
-        print(f"[DEBUG] ✅ Áudio salvo: {file_size_mb:.2f} MB ({file_size} bytes)")
+        print(f"[DEBUG] ✅ Áudio salvo: {file_size_mb:.2f} MB ({file_size} bytes), sha256={checksum}")
         print(f"[DEBUG] 📁 Formato: {ext.upper() if ext else 'DESCONHECIDO'}")
         
-        cursor.execute(
-            """UPDATE interviews SET
-                audio_file = ?,
-                date = ?
-            WHERE id = ?""",
-            (audio_file, date, id)
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            conn.execute(
+                """UPDATE interviews SET
+                    audio_file = ?,
+                    date = ?
+                WHERE id = ?""",
+                (audio_file, date, id)
+            )
+            conn.commit()
         
         total_time = time.time() - start_time
         print(f"[TIMING] ⏱️  Upload total: {total_time:.2f}s")
         print(f"{'='*80}\n")
         
-        # Iniciar transcrição em background
-        print(f"[DEBUG] 🚀 Iniciando transcrição em background para interview {id}")
-        print(f"[DEBUG] 📤 Vai enviar para AssemblyAI em breve...")
-        
-        # Importar a função de transcrição do outro router
-        from routers.interview_processing import transcribe_audio_background
-        asyncio.create_task(transcribe_audio_background(id, audio_file))
-        
-        print(f"[DEBUG] ✅ Task de transcrição criada e rodando em background")
+        # Enfileirar transcrição em background
+        print(f"[DEBUG] 🚀 Enfileirando transcrição em background para interview {id}")
+        job_id = await asyncio.to_thread(
+            enqueue_job, "transcription", id, {"audio_path": audio_file},
+            idempotency_key=f"transcription:{id}:{audio_file}"
+        )
+        print(f"[DEBUG] ✅ Job de transcrição {job_id} enfileirado")
         
+    except UploadTooLargeError as e:
+        print(f"[ERROR] ❌ {e}")
+        raise HTTPException(status_code=413, detail=str(e))
     except sqlite3.Error as e:
-        conn.close()
         print(f"[ERROR] ❌ Erro ao inserir áudio no banco de dados: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao inserir áudio no banco de dados: {e}")
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"[ERROR] ❌ Erro ao processar upload: {e}")
         import traceback
         traceback.print_exc()
@@ -124,39 +141,40 @@ async def insert_interview_audio(id: int, audio: UploadFile = File(...)):
 
     return JSONResponse(content={
         "id": id,
+        "job_id": job_id,
+        "file_size": file_size,
+        "sha256": checksum,
         "message": "Áudio registrado com sucesso! Transcrição iniciada em background."
     })
 
 @router.post("/questions")
 def insert_question(request: QuestionCreateRequest):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM interviews WHERE id = ?
-            """,
-            (request.interview_id,)
-        )
-        if cursor.fetchone()[0] == 0:
-            raise HTTPException(status_code=404, detail="Entrevista não encontrada")
-
-        cursor.execute(
-            """
-                INSERT INTO questions (
-                    question,
-                    interview_id
-                )
-                VALUES (?, ?)
-            """,
-            (request.question, request.interview_id)
-        )
-        qid = cursor.lastrowid
-        conn.commit()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*) FROM interviews WHERE id = ?
+                """,
+                (request.interview_id,)
+            )
+            if cursor.fetchone()[0] == 0:
+                raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+
+            cursor.execute(
+                """
+                    INSERT INTO questions (
+                        question,
+                        interview_id
+                    )
+                    VALUES (?, ?)
+                """,
+                (request.question, request.interview_id)
+            )
+            qid = cursor.lastrowid
+            conn.commit()
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao inserir pergunta no banco de dados: {e}")
-    finally:
-        conn.close()
 
     return JSONResponse(content={
         "id": qid,
@@ -166,39 +184,35 @@ def insert_question(request: QuestionCreateRequest):
 @router.get("/{id}/questions")
 def get_questions(id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-                SELECT id, question, interview_id FROM questions WHERE interview_id = ?
-            """,
-            (id,)
-        )
-        rows = cursor.fetchall()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                    SELECT id, question, interview_id FROM questions WHERE interview_id = ?
+                """,
+                (id,)
+            )
+            rows = cursor.fetchall()
         question_list = [{"id": row["id"], "question": row["question"], "interview_id": row["interview_id"]} for row in rows]
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar perguntas: {e}")
-    finally:
-        conn.close()
     return JSONResponse(content=question_list)
 
 @router.delete("/questions/{question_id}")
 def delete_questions(question_id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-                DELETE FROM questions WHERE id = ?
-            """,
-            (question_id,)
-        )
-        deleted = cursor.rowcount
-        conn.commit()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                    DELETE FROM questions WHERE id = ?
+                """,
+                (question_id,)
+            )
+            deleted = cursor.rowcount
+            conn.commit()
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Erro ao deletar pergunta no banco de dados")
-    finally:
-        conn.close()
 
     if deleted == 0:
         raise HTTPException(status_code=404, detail="Pergunta não encontrada")
@@ -206,165 +220,240 @@ def delete_questions(question_id: int):
     return JSONResponse(content={"message": "Pergunta deletada com sucesso"})
 
 
+# Colunas leves usadas pela listagem em modo "summary" (sem transcript/analysis)
+INTERVIEW_SUMMARY_COLUMNS = [
+    "interviews.id",
+    "interviews.name",
+    "interviews.email",
+    "interviews.number",
+    "interviews.date",
+    "interviews.audio_file",
+    "interviews.notes",
+    "interviews.score",
+    "interviews.duration",
+    "positions.id AS position_id",
+    "positions.position AS position",
+]
+
+INTERVIEW_FULL_COLUMNS = INTERVIEW_SUMMARY_COLUMNS + [
+    "interview_transcripts.transcript",
+    "interview_analyses.analysis",
+]
+
+def has_speaker_diarization(transcript) -> bool:
+    """Verifica se o transcript (dict com utterances ou lista) tem speakers A/B"""
+    utterances = transcript.get("utterances", []) if isinstance(transcript, dict) else transcript
+    if not isinstance(utterances, list):
+        return False
+    return any(
+        isinstance(utt, dict) and utt.get("speaker") and str(utt.get("speaker")).upper() in ['A', 'B']
+        for utt in utterances
+    )
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1, description='Palavras buscadas (todas devem aparecer); `pref*` busca por prefixo e "entre aspas" a frase exata'),
+    position_id: int = Query(None, description="Filtra pelo cargo"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Busca nas transcrições, anotações, análises e nomes dos candidatos, ordenada por relevância"""
+    try:
+        with db_connection() as conn:
+            rows = search_interviews(conn, q, position_id=position_id, limit=limit, offset=offset)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar entrevistas: {e}")
+
+    return JSONResponse(content={
+        "query": q,
+        "results": [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "date": row["date"],
+                "score": row["score"],
+                "position_id": row["position_id"],
+                "position": row["position"],
+                "rank": row["rank"],
+                "snippet": row["snippet"]
+            }
+            for row in rows
+        ],
+        "limit": limit,
+        "offset": offset
+    })
+
 @router.get("/{position_id}")
 def get_interviews_by_position(
     position_id: int = 0,
-    page: int = Query(1, ge=1, description="Número da página"),
-    per_page: int = Query(10, ge=1, le=100, description="Itens por página")
+    page: int = Query(1, ge=1, description="Número da página (ignorado quando `after` é informado)"),
+    per_page: int = Query(10, ge=1, le=100, description="Itens por página"),
+    view: str = Query("full", pattern="^(summary|full)$", description="'summary' omite transcript e analysis"),
+    after: str = Query(None, description="Cursor `next_cursor` da página anterior"),
+    include_total: bool = Query(True, description="Calcula total e pages (COUNT(*) a cada requisição)")
 ):
-    offset = (page - 1) * per_page
+    full = view == "full"
+    columns = ",\n                ".join(INTERVIEW_FULL_COLUMNS if full else INTERVIEW_SUMMARY_COLUMNS)
+    # Por cargo: mais recentes primeiro; todos os cargos: ranking por score
+    if position_id:
+        sort_key, where, params = "date", ["interviews.position_id = ?"], [position_id]
+    else:
+        sort_key, where, params = "score", [], []
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        if position_id:
-            cursor.execute("SELECT COUNT(*) FROM interviews WHERE position_id = ?", (position_id,))
-            total = cursor.fetchone()[0]
-            cursor.execute(
-                """
-                    SELECT
-                        interviews.id,
-                        interviews.name,
-                        interviews.email,
-                        interviews.number,
-                        interviews.date,
-                        interviews.audio_file,
-                        interviews.transcript,
-                        interviews.analysis,
-                        interviews.notes,
-                        interviews.score,
-                        interviews.duration,
-                        positions.id AS position_id,
-                        positions.position AS position
-                    FROM interviews
-                    JOIN positions ON interviews.position_id = positions.id
-                    WHERE position_id = ?
-                    ORDER BY date DESC LIMIT ? OFFSET ?
-                """,
-                (position_id, per_page, offset)
-            )
-        else:
-            cursor.execute("SELECT COUNT(*) FROM interviews")
-            total = cursor.fetchone()[0]
-            cursor.execute(
-                """
+        cursor_values = decode_cursor(after, 2) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        with db_connection() as conn:
+            total = None
+            if include_total:
+                where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+                total = conn.execute(f"SELECT COUNT(*) FROM interviews {where_sql}", params).fetchone()[0]
+            rows = fetch_keyset_page(
+                conn,
+                f"""
                     SELECT
-                        interviews.id,
-                        interviews.name,
-                        interviews.email,
-                        interviews.number,
-                        interviews.audio_file,
-                        interviews.date,
-                        interviews.transcript,
-                        interviews.analysis,
-                        interviews.notes,
-                        interviews.score,
-                        interviews.duration,
-                        positions.id AS position_id,
-                        positions.position AS position
+                        {columns}
                     FROM interviews
                     JOIN positions ON interviews.position_id = positions.id
-                    ORDER BY score DESC LIMIT ? OFFSET ?
+                    {f"{TRANSCRIPT_JOIN} {ANALYSIS_JOIN}" if full else ""}
                 """,
-                (per_page, offset)
+                where, params, f"interviews.{sort_key}", "interviews.id",
+                cursor_values, per_page + 1, offset=(page - 1) * per_page
             )
-        rows = cursor.fetchall()
-        conn.close()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
         interviews = []
         for row in rows:
-            # Parse seguro do transcript
-            transcript = ""
-            if row["transcript"]:
-                try:
-                    transcript = json.loads(row["transcript"])
-                    # Verificar se tem diarização (speakers A/B)
-                    if isinstance(transcript, dict) and transcript.get("utterances"):
-                        utterances = transcript["utterances"]
-                        has_diarization = any(
-                            utt.get("speaker") and 
-                            (str(utt.get("speaker")).upper() in ['A', 'B'])
-                            for utt in utterances
-                        )
-                        print(f"[DEBUG] 📋 Interview {row['id']}: transcript tem {len(utterances)} utterances, diarização: {has_diarization}")
-                    elif isinstance(transcript, list):
-                        has_diarization = any(
-                            utt.get("speaker") and 
-                            (str(utt.get("speaker")).upper() in ['A', 'B'])
-                            for utt in transcript
-                        )
-                        print(f"[DEBUG] 📋 Interview {row['id']}: transcript tem {len(transcript)} utterances, diarização: {has_diarization}")
-                except (json.JSONDecodeError, TypeError):
-                    print(f"[WARNING] Erro ao parsear transcript da entrevista {row['id']}, usando string vazia")
-                    transcript = ""
-            
-            # Parse seguro do analysis
-            analysis = ""
-            if row["analysis"]:
-                try:
-                    analysis = json.loads(row["analysis"])
-                except (json.JSONDecodeError, TypeError):
-                    print(f"[WARNING] Erro ao parsear analysis da entrevista {row['id']}, usando string vazia")
-                    analysis = ""
-            
-            # 🚨 LOG CRÍTICO: verificar diarização antes de enviar para o frontend
-            if transcript:
-                if isinstance(transcript, dict) and transcript.get("utterances"):
-                    utterances = transcript["utterances"]
-                    sample_speakers = [u.get("speaker") for u in utterances[:5]]
-                    all_speakers = list(set([u.get("speaker") for u in utterances]))
-                    has_diarization_check = any(s in ['A', 'B'] for s in all_speakers if s)
-                    print(f"[DEBUG] 🌐 Enviando para frontend - Interview {row['id']}:")
-                    print(f"         - Tipo: dict com utterances")
-                    print(f"         - Total utterances: {len(utterances)}")
-                    print(f"         - Primeiros 5 speakers: {sample_speakers}")
-                    print(f"         - Todos speakers únicos: {all_speakers}")
-                    print(f"         - TEM DIARIZAÇÃO: {'✅ SIM' if has_diarization_check else '❌ NÃO'}")
-                elif isinstance(transcript, list):
-                    sample_speakers = [u.get("speaker") for u in transcript[:5]]
-                    all_speakers = list(set([u.get("speaker") for u in transcript]))
-                    has_diarization_check = any(s in ['A', 'B'] for s in all_speakers if s)
-                    print(f"[DEBUG] 🌐 Enviando para frontend - Interview {row['id']}:")
-                    print(f"         - Tipo: list")
-                    print(f"         - Total utterances: {len(transcript)}")
-                    print(f"         - Primeiros 5 speakers: {sample_speakers}")
-                    print(f"         - Todos speakers únicos: {all_speakers}")
-                    print(f"         - TEM DIARIZAÇÃO: {'✅ SIM' if has_diarization_check else '❌ NÃO'}")
-            
-            interviews.append({
+            interview = {
                 "id": row["id"],
                 "name": row["name"],
                 "email": row["email"],
                 "number": row["number"],
                 "date": row["date"],
                 "audio_file": row["audio_file"],
-                "transcript": transcript,
-                "analysis": analysis,
                 "notes": row["notes"],
                 "score": row["score"],
                 "duration": row["duration"] if row["duration"] else None,
                 "position_id": row["position_id"],
                 "position": row["position"]
-            })
+            }
+
+            if full:
+                # Parse seguro do transcript e do analysis (apenas no modo completo)
+                transcript = parse_transcript_column(row["id"], decode_stored_safe(row["id"], "transcript", row["transcript"]))
+                interview["transcript"] = transcript
+                interview["analysis"] = parse_json_column(row["id"], "analysis", decode_stored_safe(row["id"], "analysis", row["analysis"]))
+                if transcript:
+                    print(f"[DEBUG] 🌐 Interview {row['id']}: TEM DIARIZAÇÃO: {'✅ SIM' if has_speaker_diarization(transcript) else '❌ NÃO'}")
+
+            interviews.append(interview)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao acessar o banco de dados: {e}")
 
+    next_cursor = encode_cursor(rows[-1][sort_key], rows[-1]["id"]) if has_more else None
     return JSONResponse(content={
         "interviews": interviews,
         "total": total,
-        "page": page,
+        "page": None if after else page,
         "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": next_cursor,
+        "view": view
+    })
+
+@router.get("/{id}/detail")
+def get_interview_detail(id: int):
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                    SELECT
+                        interviews.id,
+                        interviews.name,
+                        interviews.email,
+                        interviews.number,
+                        interviews.date,
+                        interviews.audio_file,
+                        interviews.notes,
+                        interviews.score,
+                        interviews.duration,
+                        EXISTS (SELECT 1 FROM interview_transcripts WHERE interview_id = interviews.id) AS has_transcript,
+                        EXISTS (SELECT 1 FROM interview_analyses WHERE interview_id = interviews.id) AS has_analysis,
+                        positions.id AS position_id,
+                        positions.position AS position
+                    FROM interviews
+                    LEFT JOIN positions ON interviews.position_id = positions.id
+                    WHERE interviews.id = ?
+                """,
+                (id,)
+            )
+            row = cursor.fetchone()
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao acessar o banco de dados: {e}")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+
+    return JSONResponse(content={
+        "id": row["id"],
+        "name": row["name"],
+        "email": row["email"],
+        "number": row["number"],
+        "date": row["date"],
+        "audio_file": row["audio_file"],
+        "notes": row["notes"],
+        "score": row["score"],
+        "duration": row["duration"] if row["duration"] else None,
+        "has_transcript": bool(row["has_transcript"]),
+        "has_analysis": bool(row["has_analysis"]),
+        "position_id": row["position_id"],
+        "position": row["position"]
+    })
+
+@router.get("/{id}/transcript")
+def get_interview_transcript(id: int):
+    try:
+        with db_connection() as conn:
+            row = conn.execute("SELECT id FROM interviews WHERE id = ?", (id,)).fetchone()
+            transcript = get_transcript(conn, id) if row else None
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao acessar o banco de dados: {e}")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+
+    return JSONResponse(content={
+        "id": id,
+        "transcript": parse_transcript_column(id, transcript)
+    })
+
+@router.get("/{id}/analysis")
+def get_interview_analysis(id: int):
+    try:
+        with db_connection() as conn:
+            row = conn.execute("SELECT score FROM interviews WHERE id = ?", (id,)).fetchone()
+            analysis = get_analysis(conn, id) if row else None
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao acessar o banco de dados: {e}")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Entrevista não encontrada")
+
+    return JSONResponse(content={
+        "id": id,
+        "analysis": parse_json_column(id, "analysis", analysis),
+        "score": row["score"]
     })
 
 @router.get("/audio/{id}")
 def download_interview_audio(id: int):
-    conn = None
     try:
         print(f"\n[DEBUG] 🎵 Requisição de áudio para interview ID: {id}")
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,))
-        row = cursor.fetchone()
+        with db_connection() as conn:
+            row = conn.execute("SELECT audio_file FROM interviews WHERE id = ?", (id,)).fetchone()
 
         if not row:
             print(f"[ERROR] ❌ Entrevista {id} não encontrada no banco")
@@ -425,23 +514,21 @@ def download_interview_audio(id: int):
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 
 @router.patch("/{id}/notes")
 def update_interview_notes(id: int, notes_data: NotesUpdateRequest):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE interviews SET notes = ? WHERE id = ?",
-            (notes_data.notes, id)
-        )
-        conn.commit()
-        updated = cursor.rowcount
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE interviews SET notes = ? WHERE id = ?",
+                (notes_data.notes, id)
+            )
+            updated = cursor.rowcount
+            if updated:
+                index_interview(conn, id)
+            conn.commit()
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar anotações: {e}")
     
@@ -453,12 +540,12 @@ def update_interview_notes(id: int, notes_data: NotesUpdateRequest):
 @router.delete("/{id}")
 def delete_interview(id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM interviews WHERE id = ?", (id,))
-        conn.commit()
-        deleted = cursor.rowcount
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM interviews WHERE id = ?", (id,))
+            deleted = cursor.rowcount
+            index_interview(conn, id)
+            conn.commit()
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Erro ao deletar entrevista no banco de dados")
 
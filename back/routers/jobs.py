@@ -0,0 +1,52 @@
+import sqlite3
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from database import db_connection
+from jobs import get_job, job_to_dict, JOB_STATUSES
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+@router.get("/{job_id}")
+def get_job_status(job_id: int):
+    try:
+        job = get_job(job_id)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar job: {e}")
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    return JSONResponse(content=job)
+
+@router.get("")
+def list_jobs(
+    interview_id: int = Query(None),
+    status: str = Query(None, description=f"Um de: {', '.join(JOB_STATUSES)}"),
+    limit: int = Query(50, ge=1, le=200)
+):
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status inválido: {status}")
+
+    conditions = []
+    params = []
+    if interview_id:
+        conditions.append("interview_id = ?")
+        params.append(interview_id)
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    try:
+        with db_connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar jobs: {e}")
+
+    return JSONResponse(content={"jobs": [job_to_dict(row) for row in rows]})
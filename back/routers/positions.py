@@ -2,8 +2,12 @@ import json
 import sqlite3
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
-from database import get_db_connection
+from database import db_connection
+from interview_store import index_interview
 from models import PositionCreateRequest
+from pagination import encode_cursor, decode_cursor
+from batch_analysis import create_batch, get_batch, running_batch_for_position
+from routers.interview_processing import enqueue_analysis
 
 router = APIRouter(
     tags=["Positions"]
@@ -11,27 +15,23 @@ router = APIRouter(
 
 @router.post("/positions")
 def create_position(position: PositionCreateRequest):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     skills_json = json.dumps(position.skills)
 
     try:
-        cursor.execute(
-            """
-            INSERT INTO positions (position, skills, description, vacancies)
-            VALUES (?, ?, ?, ?)
-            """,
-            (position.position, skills_json, position.description, position.vacancies or 0)
-        )
-        conn.commit()
-        inserted_id = cursor.lastrowid
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO positions (position, skills, description, vacancies)
+                VALUES (?, ?, ?, ?)
+                """,
+                (position.position, skills_json, position.description, position.vacancies or 0)
+            )
+            conn.commit()
+            inserted_id = cursor.lastrowid
     except sqlite3.Error as e:
-        conn.close()
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
-    conn.close()
-
     return JSONResponse(content={
         "id": inserted_id,
         "message": "Cargo registrado com sucesso!"
@@ -39,25 +39,45 @@ def create_position(position: PositionCreateRequest):
 
 @router.get("/positions")
 def get_positions(
-    page: int = Query(1, ge=1, description="Número da página"),
-    per_page: int = Query(10, ge=1, le=100, description="Itens por página")
+    page: int = Query(1, ge=1, description="Número da página (ignorado quando `after` é informado)"),
+    per_page: int = Query(10, ge=1, le=100, description="Itens por página"),
+    after: str = Query(None, description="Cursor `next_cursor` da página anterior"),
+    include_total: bool = Query(True, description="Calcula total e pages (COUNT(*) a cada requisição)")
 ):
-    offset = (page - 1) * per_page
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM positions")
-        total = cursor.fetchone()[0]
-        cursor.execute(
-            """
-                SELECT *
-                FROM positions
-                ORDER BY id DESC LIMIT ? OFFSET ?
-            """,
-            (per_page, offset)
-        )
-        rows = cursor.fetchall()
-        conn.close()
+        last_id = decode_cursor(after, 1)[0] if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            total = None
+            if include_total:
+                cursor.execute("SELECT COUNT(*) FROM positions")
+                total = cursor.fetchone()[0]
+            if after:
+                cursor.execute(
+                    """
+                        SELECT *
+                        FROM positions
+                        WHERE id < ?
+                        ORDER BY id DESC LIMIT ?
+                    """,
+                    (last_id, per_page + 1)
+                )
+            else:
+                cursor.execute(
+                    """
+                        SELECT *
+                        FROM positions
+                        ORDER BY id DESC LIMIT ? OFFSET ?
+                    """,
+                    (per_page + 1, (page - 1) * per_page)
+                )
+            rows = cursor.fetchall()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
         positions = []
         for row in rows:
             # Verificar se a coluna vacancies existe (para tabelas antigas)
@@ -81,22 +101,22 @@ def get_positions(
     return JSONResponse(content={
         "positions": positions,
         "total": total,
-        "page": page,
+        "page": None if after else page,
         "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": encode_cursor(rows[-1]["id"]) if has_more else None
     })
 
 @router.get("/positions/{position_id}")
 def get_position(position_id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM positions WHERE id = ?",
-            (position_id,)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM positions WHERE id = ?",
+                (position_id,)
+            )
+            row = cursor.fetchone()
         
         if not row:
             raise HTTPException(status_code=404, detail="Cargo não encontrado")
@@ -121,31 +141,28 @@ def get_position(position_id: int):
 
 @router.patch("/positions/{position_id}")
 def update_position(position_id: int, position: PositionCreateRequest):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Verificar se o cargo existe
-    cursor.execute("SELECT id FROM positions WHERE id = ?", (position_id,))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Cargo não encontrado")
-    
     skills_json = json.dumps(position.skills)
-    
+
     try:
-        cursor.execute(
-            """
-            UPDATE positions 
-            SET position = ?, skills = ?, description = ?, vacancies = ?
-            WHERE id = ?
-            """,
-            (position.position, skills_json, position.description, position.vacancies or 0, position_id)
-        )
-        conn.commit()
-        updated = cursor.rowcount
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Verificar se o cargo existe
+            cursor.execute("SELECT id FROM positions WHERE id = ?", (position_id,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Cargo não encontrado")
+
+            cursor.execute(
+                """
+                UPDATE positions 
+                SET position = ?, skills = ?, description = ?, vacancies = ?
+                WHERE id = ?
+                """,
+                (position.position, skills_json, position.description, position.vacancies or 0, position_id)
+            )
+            conn.commit()
+            updated = cursor.rowcount
     except sqlite3.Error as e:
-        conn.close()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar cargo: {e}")
     
     if updated == 0:
@@ -159,13 +176,15 @@ def update_position(position_id: int, position: PositionCreateRequest):
 @router.delete("/positions/{position_id}")
 def delete_position(position_id: int):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM interviews WHERE position_id = ?", (position_id,))
-        cursor.execute("DELETE FROM positions WHERE id = ?", (position_id,))
-        conn.commit()
-        deleted = cursor.rowcount
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            interview_ids = [row["id"] for row in cursor.execute("SELECT id FROM interviews WHERE position_id = ?", (position_id,))]
+            cursor.execute("DELETE FROM interviews WHERE position_id = ?", (position_id,))
+            for interview_id in interview_ids:
+                index_interview(conn, interview_id)
+            cursor.execute("DELETE FROM positions WHERE id = ?", (position_id,))
+            conn.commit()
+            deleted = cursor.rowcount
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Erro ao deletar cargo no banco de dados")
     
@@ -173,3 +192,49 @@ def delete_position(position_id: int):
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
     return JSONResponse(content={"message": "Cargo deletado com sucesso"})
+
+@router.post("/positions/{position_id}/analyze")
+def analyze_position(
+    position_id: int,
+    force: bool = Query(False, description="Reanalisa também as entrevistas que já têm análise (ignorando o cache)")
+):
+    """Enfileira um job de análise por entrevista do cargo; o progresso é consultado em GET /positions/{id}/analyze/{batch_id}.
+
+    Concorrência e taxa são as dos workers de jobs (ANALYSIS_JOB_CONCURRENCY e ANALYSIS_JOB_RATE_PER_MINUTE).
+    """
+    try:
+        running = running_batch_for_position(position_id)
+        if running:
+            return JSONResponse(status_code=202, content={**running, "message": "Já existe uma análise em lote em andamento para este cargo"})
+
+        with db_connection() as conn:
+            if not conn.execute("SELECT id FROM positions WHERE id = ?", (position_id,)).fetchone():
+                raise HTTPException(status_code=404, detail="Cargo não encontrado")
+            rows = conn.execute(
+                """
+                SELECT id, EXISTS (SELECT 1 FROM interview_analyses WHERE interview_id = interviews.id) AS analyzed
+                FROM interviews WHERE position_id = ? ORDER BY id
+                """,
+                (position_id,)
+            ).fetchall()
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao acessar o banco de dados: {e}")
+
+    pending = [row["id"] for row in rows if force or not row["analyzed"]]
+    skipped = [row["id"] for row in rows if not force and row["analyzed"]]
+    try:
+        job_ids = {interview_id: enqueue_analysis(interview_id, force=force) for interview_id in pending}
+        batch = get_batch(create_batch(position_id, job_ids, skipped, force=force))
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao enfileirar análises: {e}")
+    return JSONResponse(status_code=202, content={**batch, "message": f"{len(pending)} entrevista(s) enfileirada(s) para análise"})
+
+@router.get("/positions/{position_id}/analyze/{batch_id}")
+def get_position_analysis_batch(position_id: int, batch_id: str):
+    try:
+        batch = get_batch(batch_id)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar lote de análise: {e}")
+    if not batch or batch["position_id"] != position_id:
+        raise HTTPException(status_code=404, detail="Lote de análise não encontrado")
+    return JSONResponse(content=batch)
@@ -0,0 +1,54 @@
+import os
+from collections import deque
+
+# Quanto da conversa (em segundos) fica em memória durante a gravação
+SESSION_TRANSCRIPT_RETENTION_SECONDS = int(os.getenv("SESSION_TRANSCRIPT_RETENTION_SECONDS", "600"))
+# Limite de falas em memória, independente do tempo
+SESSION_TRANSCRIPT_MAX_UTTERANCES = int(os.getenv("SESSION_TRANSCRIPT_MAX_UTTERANCES", "2000"))
+
+
+class SessionTranscript:
+    """Falas finalizadas de uma sessão em tempo real, em janela deslizante.
+
+    Só as falas dos últimos `retention_seconds` (e no máximo `max_utterances`) ficam
+    em memória, então sessões de horas não crescem sem limite. Timestamps em ms.
+    """
+
+    def __init__(self, retention_seconds: int = None, max_utterances: int = None):
+        if retention_seconds is None:
+            retention_seconds = SESSION_TRANSCRIPT_RETENTION_SECONDS
+        if max_utterances is None:
+            max_utterances = SESSION_TRANSCRIPT_MAX_UTTERANCES
+        self.retention_ms = retention_seconds * 1000
+        self._utterances = deque(maxlen=max_utterances)
+        self.total = 0
+
+    def __len__(self):
+        return len(self._utterances)
+
+    def append(self, utterance: dict):
+        self._utterances.append(utterance)
+        self.total += 1
+        cutoff = utterance["end"] - self.retention_ms
+        while self._utterances[0]["end"] < cutoff:
+            self._utterances.popleft()
+
+    def last_n_seconds(self, n_seconds: float, pending=()) -> list:
+        """Falas que terminaram nos últimos n_seconds, incluindo `pending` (falas em andamento)"""
+        pending = [utt for utt in pending if utt.get("text")]
+        ends = [utt["end"] for utt in pending]
+        if self._utterances:
+            ends.append(self._utterances[-1]["end"])
+        if not ends:
+            return []
+        cutoff = max(ends) - n_seconds * 1000
+
+        window = []
+        for utt in reversed(self._utterances):
+            if utt["end"] < cutoff:
+                break
+            window.append(utt)
+        window.reverse()
+        window.extend(utt for utt in pending if utt["end"] >= cutoff)
+        window.sort(key=lambda utt: utt["start"])
+        return window
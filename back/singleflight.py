@@ -0,0 +1,34 @@
+import asyncio
+
+
+class SingleFlight:
+    """Deduplica operações assíncronas simultâneas pela mesma chave.
+
+    Enquanto uma operação está em andamento, novas chamadas com a mesma chave
+    aguardam o mesmo resultado (ou a mesma exceção) em vez de repetir o trabalho.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+
+    def in_flight(self, key) -> bool:
+        return key in self._inflight
+
+    async def do(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            print(f"[SINGLEFLIGHT] 🔗 {self.name} {key} já em andamento - aguardando o mesmo resultado")
+        # shield: se um dos chamadores for cancelado (ex.: cliente desconectou), os outros continuam
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marca a exceção como consumida mesmo que todos os chamadores tenham sido cancelados
+            task.exception()
@@ -0,0 +1,65 @@
+import os
+import asyncio
+
+# Palavras novas (desde a última sugestão) que disparam uma nova sugestão
+SUGGESTION_NEW_WORDS_THRESHOLD = int(os.getenv("SUGGESTION_NEW_WORDS_THRESHOLD", "40"))
+# Fala finalizada com pelo menos essa quantidade de palavras dispara uma sugestão
+SUGGESTION_MIN_TURN_WORDS = int(os.getenv("SUGGESTION_MIN_TURN_WORDS", "6"))
+# Espera após o gatilho para juntar falas que chegam em sequência
+SUGGESTION_DEBOUNCE_SECONDS = float(os.getenv("SUGGESTION_DEBOUNCE_SECONDS", "2"))
+# Intervalo mínimo entre duas chamadas ao LLM na mesma sessão
+SUGGESTION_MIN_INTERVAL_SECONDS = float(os.getenv("SUGGESTION_MIN_INTERVAL_SECONDS", "15"))
+
+
+class SuggestionTrigger:
+    """Decide quando pedir novas sugestões de perguntas ao LLM durante a gravação.
+
+    Dispara quando uma fala é finalizada ou quando acumula palavras novas suficientes;
+    aplica debounce e intervalo mínimo entre chamadas, e não chama o LLM se nada de
+    novo foi dito desde a última sugestão.
+    """
+
+    def __init__(self, callback, new_words_threshold: int = None, min_turn_words: int = None,
+                 debounce: float = None, min_interval: float = None):
+        self.callback = callback
+        self.new_words_threshold = SUGGESTION_NEW_WORDS_THRESHOLD if new_words_threshold is None else new_words_threshold
+        self.min_turn_words = SUGGESTION_MIN_TURN_WORDS if min_turn_words is None else min_turn_words
+        self.debounce = SUGGESTION_DEBOUNCE_SECONDS if debounce is None else debounce
+        self.min_interval = SUGGESTION_MIN_INTERVAL_SECONDS if min_interval is None else min_interval
+        self._new_words = 0
+        self._triggered = asyncio.Event()
+        self._last_call = None
+        self.calls = 0
+        self.skipped = 0
+
+    def on_new_words(self, new_words: str):
+        self._new_words += len(new_words.split())
+        if self._new_words >= self.new_words_threshold:
+            self._triggered.set()
+
+    def on_turn_finalized(self, text: str):
+        if len(text.split()) >= self.min_turn_words:
+            self._triggered.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._triggered.wait()
+            await asyncio.sleep(self.debounce)
+            if self._last_call is not None:
+                wait = self._last_call + self.min_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._triggered.clear()
+
+            if self._new_words == 0:
+                self.skipped += 1
+                continue
+
+            self._new_words = 0
+            self._last_call = loop.time()
+            self.calls += 1
+            try:
+                await self.callback()
+            except Exception as e:
+                print(f"[SUGGESTIONS] ❌ Erro ao gerar sugestões de perguntas: {e}")
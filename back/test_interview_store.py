@@ -0,0 +1,59 @@
+import json
+import pytest
+import database
+from interview_store import build_snippet, search_interviews, index_interview, save_transcript, get_transcript
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "pool", database.ConnectionPool(str(tmp_path / "interviews.db")))
+    database.create_table()
+    with database.db_connection() as conn:
+        yield conn
+    database.pool.close_all()
+
+
+def add_interview(conn, name, notes="", transcript=None) -> int:
+    conn.execute("INSERT OR IGNORE INTO positions (id, position, skills, description) VALUES (1, 'p', '[]', 'd')")
+    interview_id = conn.execute(
+        "INSERT INTO interviews (name, email, number, notes, position_id) VALUES (?, 'e', '1', ?, 1)", (name, notes)
+    ).lastrowid
+    index_interview(conn, interview_id)
+    if transcript:
+        save_transcript(conn, interview_id, json.dumps([{"speaker": "A", "text": transcript}]))
+    conn.commit()
+    return interview_id
+
+
+def test_snippet_escapes_html():
+    snippet = build_snippet(["kubernetes <img src=x onerror=alert(1)> & cia"], [("kubernetes", False)])
+    assert snippet == "<mark>kubernetes</mark> &lt;img src=x onerror=alert(1)&gt; &amp; cia"
+
+
+def test_search_snippet_escapes_notes(conn):
+    add_interview(conn, "Ana", notes="Sabe <b>Python</b> & SQL")
+    [result] = search_interviews(conn, "python")
+    assert result["snippet"] == "Sabe &lt;b&gt;<mark>Python</mark>&lt;/b&gt; &amp; SQL"
+
+
+def test_search_ignores_accents_and_reindexes(conn):
+    interview_id = add_interview(conn, "Bruno", transcript="trabalhei com programação assíncrona")
+    assert [r["id"] for r in search_interviews(conn, "programacao")] == [interview_id]
+
+    save_transcript(conn, interview_id, json.dumps([{"speaker": "A", "text": "agora só java"}]))
+    conn.commit()
+    assert search_interviews(conn, "programacao") == []
+    assert [r["id"] for r in search_interviews(conn, "java")] == [interview_id]
+
+
+@pytest.mark.parametrize("corrupt", [b"\x02\xaa\xbb", b"\x01\xaa\xbb"])
+def test_corrupt_stored_values_read_as_empty(conn, corrupt):
+    interview_id = add_interview(conn, "Carla", notes="golang", transcript="fala sobre golang")
+    conn.execute("UPDATE interview_transcripts SET transcript = ?", (corrupt,))
+    conn.execute("UPDATE interview_search_docs SET indexed = ?", (corrupt,))
+    conn.commit()
+
+    assert get_transcript(conn, interview_id) is None
+    assert search_interviews(conn, "golang")[0]["snippet"] == ""
+    index_interview(conn, interview_id)
+    assert search_interviews(conn, "golang")[0]["snippet"] == "<mark>golang</mark>"
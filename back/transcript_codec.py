@@ -0,0 +1,121 @@
+import os
+import json
+
+# Formato usado ao gravar transcrições no banco: "json" (padrão) ou "compact"
+TRANSCRIPT_STORAGE_FORMAT = os.getenv("TRANSCRIPT_STORAGE_FORMAT", "json")
+# Inclui [mm:ss] no início de cada fala do prompt de análise
+ANALYSIS_PROMPT_TIMESTAMPS = os.getenv("ANALYSIS_PROMPT_TIMESTAMPS", "false").lower() == "true"
+
+# Formato compacto: cabeçalho + uma fala por linha "speaker<TAB>start<TAB>end<TAB>texto"
+COMPACT_HEADER = "#transcript-v1"
+
+_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+
+def _escape(text: str) -> str:
+    return "".join(_ESCAPES.get(ch, ch) for ch in text)
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    out = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append(_UNESCAPES.get(nxt, nxt))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def encode_compact(utterances: list) -> str:
+    lines = [COMPACT_HEADER]
+    for utt in utterances:
+        start = utt.get("start")
+        end = utt.get("end")
+        lines.append("\t".join([
+            _escape(str(utt.get("speaker") or "")),
+            "" if start is None else str(start),
+            "" if end is None else str(end),
+            _escape(utt.get("text") or ""),
+        ]))
+    return "\n".join(lines)
+
+
+def _parse_time(value: str):
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def decode_compact(value: str) -> list:
+    utterances = []
+    for line in value.split("\n")[1:]:
+        if not line:
+            continue
+        speaker, start, end, text = line.split("\t", 3)
+        utterances.append({
+            "speaker": _unescape(speaker),
+            "text": _unescape(text),
+            "start": _parse_time(start),
+            "end": _parse_time(end),
+        })
+    return utterances
+
+
+def dump_transcript(utterances: list, fmt: str = None) -> str:
+    """Serializa as falas para gravar na coluna transcript"""
+    if (fmt or TRANSCRIPT_STORAGE_FORMAT) == "compact":
+        return encode_compact(utterances)
+    return json.dumps({"utterances": utterances})
+
+
+def load_transcript(value) -> list:
+    """Lista de falas de uma transcrição salva (JSON {"utterances": [...]}, lista JSON ou formato compacto).
+
+    Lança ValueError se o valor não estiver em nenhum dos formatos.
+    """
+    if not value:
+        return []
+    if isinstance(value, (list, dict)):
+        parsed = value
+    elif value.startswith(COMPACT_HEADER):
+        return decode_compact(value)
+    else:
+        parsed = json.loads(value)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("utterances", [])
+    if not isinstance(parsed, list):
+        raise ValueError("Formato de transcrição inválido")
+    return parsed
+
+
+def _format_timestamp(ms) -> str:
+    seconds = int((ms or 0) // 1000)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def transcript_for_prompt(utterances: list, timestamps: bool = None) -> str:
+    """Transcrição compacta para o LLM: "A: texto" por linha, juntando falas seguidas do mesmo speaker"""
+    if timestamps is None:
+        timestamps = ANALYSIS_PROMPT_TIMESTAMPS
+    lines = []
+    last_speaker = None
+    for utt in utterances:
+        text = " ".join((utt.get("text") or "").split())
+        if not text:
+            continue
+        speaker = utt.get("speaker") or "?"
+        if speaker == last_speaker:
+            lines[-1] += " " + text
+            continue
+        prefix = f"[{_format_timestamp(utt.get('start'))}] " if timestamps else ""
+        lines.append(f"{prefix}{speaker}: {text}")
+        last_speaker = speaker
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+import os
+import asyncio
+
+# Intervalo máximo entre envios de transcript_update para o navegador
+TRANSCRIPT_FLUSH_MS = int(os.getenv("TRANSCRIPT_FLUSH_MS", "150"))
+# Quantidade de parciais acumuladas que força um envio imediato
+TRANSCRIPT_FLUSH_MAX_UPDATES = int(os.getenv("TRANSCRIPT_FLUSH_MAX_UPDATES", "20"))
+
+
+class TranscriptUpdateBuffer:
+    """Acumula os transcript_update de uma sessão e envia em lote.
+
+    Parciais do mesmo turn são mescladas: `text` fica com o texto mais recente e
+    `new_words` com a concatenação das palavras novas desde o último envio, que é
+    o que o frontend concatena ao texto que já exibe.
+    """
+
+    def __init__(self, send, interval_ms: int = None, max_updates: int = None):
+        if interval_ms is None:
+            interval_ms = TRANSCRIPT_FLUSH_MS
+        if max_updates is None:
+            max_updates = TRANSCRIPT_FLUSH_MAX_UPDATES
+        self.send = send
+        self.interval = interval_ms / 1000
+        self.max_updates = max_updates
+        self._pending = {}  # {turn_id: utt_dict} na ordem de chegada
+        self._merged = 0
+        self._has_pending = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.messages_sent = 0
+        self.updates_received = 0
+
+    async def add(self, utt: dict):
+        self.updates_received += 1
+        current = self._pending.get(utt["id"])
+        if current is None:
+            self._pending[utt["id"]] = dict(utt)
+        else:
+            current["new_words"] += utt["new_words"]
+            current["text"] = utt["text"]
+            current["end"] = utt["end"]
+        self._merged += 1
+        self._has_pending.set()
+        if self._merged >= self.max_updates:
+            await self.flush()
+
+    async def flush(self):
+        """Envia tudo o que está pendente (chame antes de um transcript_finalize)"""
+        async with self._lock:
+            if not self._pending:
+                return
+            updates = list(self._pending.values())
+            self._pending = {}
+            self._merged = 0
+            self._has_pending.clear()
+            await self.send({"transcript_update": updates})
+            self.messages_sent += 1
+
+    async def run(self):
+        while True:
+            await self._has_pending.wait()
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[DEBUG] WebSocket fechado ao enviar transcript_update: {e}")
@@ -0,0 +1,85 @@
+import os
+import asyncio
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import assemblyai as aai
+from dotenv import load_dotenv
+from singleflight import SingleFlight
+
+load_dotenv()
+
+aai.settings.api_key = os.getenv("ASSEMBLYAI_API_KEY")
+
+# Número máximo de transcrições AssemblyAI rodando ao mesmo tempo.
+# As demais ficam na fila do executor sem bloquear o event loop.
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv("TRANSCRIPTION_MAX_WORKERS", "2"))
+
+transcription_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPTION_MAX_WORKERS,
+    thread_name_prefix="transcription"
+)
+
+def diarization_config() -> aai.TranscriptionConfig:
+    return aai.TranscriptionConfig(
+        language_code="pt",
+        speaker_labels=True,
+        speakers_expected=2,
+    )
+
+def _transcribe_sync(audio_path: str) -> aai.Transcript:
+    return aai.Transcriber(config=diarization_config()).transcribe(audio_path)
+
+# Transcrições em andamento por arquivo: chamadas simultâneas compartilham a mesma requisição
+_transcriptions = SingleFlight("Transcrição")
+
+async def transcribe_file(audio_path: str) -> aai.Transcript:
+    """Transcreve o arquivo com diarização em uma thread do executor, sem travar o event loop"""
+    loop = asyncio.get_running_loop()
+    return await _transcriptions.do(
+        os.path.abspath(audio_path),
+        lambda: loop.run_in_executor(transcription_executor, _transcribe_sync, audio_path)
+    )
+
+def normalize_speaker(speaker) -> str:
+    """Converte o speaker do AssemblyAI para o formato consistente (A, B, C...)"""
+    # AssemblyAI pode retornar como string "A", "B" ou como número 0, 1
+    if isinstance(speaker, (int, float)):
+        return chr(65 + int(speaker))  # 0 -> A, 1 -> B, etc.
+    if isinstance(speaker, str):
+        return speaker.upper()
+    return "A"
+
+def utterances_to_dicts(utterances) -> list:
+    return [
+        {
+            "speaker": normalize_speaker(utt.speaker),
+            "text": utt.text,
+            "start": utt.start,
+            "end": utt.end,
+        }
+        for utt in utterances or []
+    ]
+
+# Eventos de "transcrição salva" por entrevista, para quem está aguardando a diarização
+_transcript_waiters = {}
+
+@contextmanager
+def transcript_waiter(interview_id: int):
+    """Registra um asyncio.Event que é sinalizado quando uma nova transcrição da entrevista é salva.
+
+    Registre o waiter ANTES de reler o banco para não perder uma notificação que chegue no meio.
+    """
+    event = asyncio.Event()
+    _transcript_waiters.setdefault(interview_id, set()).add(event)
+    try:
+        yield event
+    finally:
+        waiters = _transcript_waiters.get(interview_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del _transcript_waiters[interview_id]
+
+def notify_transcript_saved(interview_id: int):
+    for event in _transcript_waiters.get(interview_id, ()):
+        event.set()
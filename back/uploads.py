@@ -0,0 +1,100 @@
+import os
+import asyncio
+import hashlib
+import aiofiles
+from fastapi import UploadFile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+UPLOAD_DIR = "uploads"
+# Arquivos de uploads retomáveis ainda em andamento
+PARTIAL_UPLOAD_DIR = os.path.join(UPLOAD_DIR, "partial")
+# Tamanho de cada bloco copiado do UploadFile para o disco
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# Tamanho máximo aceito para um arquivo de áudio
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "1024")) * 1024 * 1024
+# Uploads retomáveis sem dados novos há mais que isso são expirados e o .part é apagado
+PARTIAL_UPLOAD_TTL_HOURS = float(os.getenv("PARTIAL_UPLOAD_TTL_HOURS", "24"))
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+async def save_upload_file(upload: UploadFile, dest_path: str, max_bytes: int = None):
+    """Copia o UploadFile para o disco em blocos, com memória constante.
+
+    Retorna (tamanho_em_bytes, sha256_hex). Se o arquivo passar de `max_bytes`,
+    o arquivo parcial é removido e UploadTooLargeError é lançado.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_UPLOAD_BYTES
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(dest_path, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"Arquivo excede o tamanho máximo de {max_bytes // (1024 * 1024)} MB"
+                    )
+                hasher.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return size, hasher.hexdigest()
+
+
+def partial_upload_path(upload_id: str) -> str:
+    return os.path.join(PARTIAL_UPLOAD_DIR, f"{upload_id}.part")
+
+
+def received_bytes(upload_id: str) -> int:
+    """Offset atual de um upload retomável (bytes já gravados em disco)"""
+    path = partial_upload_path(upload_id)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+async def append_stream(stream, dest_path: str, max_bytes: int = None) -> int:
+    """Anexa os blocos de `stream` ao final de `dest_path` e retorna quantos bytes foram gravados.
+
+    Se o arquivo passar de `max_bytes`, os bytes deste envio são descartados e
+    UploadTooLargeError é lançado. Se a conexão cair no meio, o que já foi gravado
+    permanece e o cliente retoma a partir do novo offset.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_UPLOAD_BYTES
+    start = os.path.getsize(dest_path) if os.path.exists(dest_path) else 0
+    written = 0
+    async with aiofiles.open(dest_path, 'ab') as f:
+        async for chunk in stream:
+            if not chunk:
+                continue
+            if start + written + len(chunk) > max_bytes:
+                await f.truncate(start)
+                raise UploadTooLargeError(
+                    f"Arquivo excede o tamanho máximo de {max_bytes // (1024 * 1024)} MB"
+                )
+            await f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _sha256_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def sha256_file(path: str) -> str:
+    """SHA-256 de um arquivo em disco, calculado fora do event loop"""
+    return await asyncio.to_thread(_sha256_file, path)
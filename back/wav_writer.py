@@ -0,0 +1,69 @@
+import struct
+import aiofiles
+
+WAV_HEADER_SIZE = 44
+
+
+def wav_header(data_size: int, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Header RIFF/WAVE de 44 bytes para áudio PCM"""
+    return b''.join([
+        # RIFF header
+        b'RIFF',
+        struct.pack('<I', 36 + data_size),
+        b'WAVE',
+        # fmt chunk (formato do áudio)
+        b'fmt ',
+        struct.pack('<I', 16),  # fmt chunk size (16 para PCM)
+        struct.pack('<H', 1),   # audio format (1 = PCM)
+        struct.pack('<H', channels),
+        struct.pack('<I', sample_rate),
+        struct.pack('<I', sample_rate * channels * sample_width),  # byte rate
+        struct.pack('<H', channels * sample_width),  # block align
+        struct.pack('<H', sample_width * 8),  # bits per sample
+        # data chunk (dados de áudio)
+        b'data',
+        struct.pack('<I', data_size),
+    ])
+
+
+class StreamingWavWriter:
+    """Grava PCM direto em um arquivo WAV enquanto o áudio chega.
+
+    O header é escrito com tamanhos zerados na abertura e corrigido no close(),
+    sem reler nem copiar os dados de áudio.
+    """
+
+    def __init__(self, path: str, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_size = 0
+        self._file = None
+
+    async def open(self):
+        self._file = await aiofiles.open(self.path, 'wb')
+        await self._file.write(wav_header(0, self.sample_rate, self.channels, self.sample_width))
+        return self
+
+    async def write(self, frames: bytes):
+        await self._file.write(frames)
+        self.data_size += len(frames)
+
+    @property
+    def duration(self) -> float:
+        return self.data_size / (self.sample_rate * self.channels * self.sample_width)
+
+    async def close(self):
+        if self._file is None:
+            return
+        file = self._file
+        self._file = None
+        try:
+            # RIFF chunk size (offset 4) e data chunk size (offset 40)
+            await file.seek(4)
+            await file.write(struct.pack('<I', 36 + self.data_size))
+            await file.seek(40)
+            await file.write(struct.pack('<I', self.data_size))
+        finally:
+            await file.close()
@@ -7,7 +7,7 @@ import ChevronRightIcon from '../components/icons/ChevronRightIcon';
 import PlayIcon from '../components/icons/PlayIcon';
 import PauseIcon from '../components/icons/PauseIcon';
 import VolumeIcon from '../components/icons/VolumeIcon';
-import { getInterviews, getAudioUrl, generateAnalysis } from '../services/api';
+import { getInterviewById, getAudioUrl, generateAnalysis } from '../services/api';
 import './InterviewDetailPage.css';
 
 function InterviewDetailPage() {
@@ -377,84 +377,32 @@ function InterviewDetailPage() {
       setLoading(true);
       console.log(`[DEBUG] 🔍 Carregando entrevista ID: ${id}`);
       
-      // Buscar TODAS as entrevistas (positionId = 0 retorna todas)
-      console.log(`[DEBUG] 🔄 Chamando getInterviews(0)...`);
-      let interviews = [];
+      // Buscar apenas esta entrevista (detalhe + transcrição/análise sob demanda)
+      console.log(`[DEBUG] 🔄 Chamando getInterviewById(${id})...`);
+      let interview = null;
       try {
-        interviews = await getInterviews(0);
-        console.log(`[DEBUG] 📋 Total de entrevistas encontradas: ${interviews.length}`);
-        if (!Array.isArray(interviews)) {
-          console.error(`[ERROR] ❌ getInterviews não retornou um array! Tipo:`, typeof interviews);
-          throw new Error('Resposta inválida do servidor');
-        }
+        interview = await getInterviewById(id);
       } catch (err) {
-        console.error(`[ERROR] ❌ Erro ao buscar entrevistas:`, err);
-        // Se for timeout, aguardar um pouco e tentar novamente
-        if (err.message && err.message.includes('Timeout')) {
-          console.log(`[DEBUG] ⏳ Timeout detectado, aguardando 2 segundos e tentando novamente...`);
+        console.error(`[ERROR] ❌ Erro ao buscar entrevista:`, err);
+        if (err.message && err.message.includes('não encontrada')) {
+          interview = null;
+        } else {
+          // Aguardar um pouco e tentar novamente
+          console.log(`[DEBUG] ⏳ Aguardando 2 segundos e tentando novamente...`);
           await new Promise(resolve => setTimeout(resolve, 2000));
           try {
-            interviews = await getInterviews(0);
-            console.log(`[DEBUG] 📋 Retry bem-sucedido: ${interviews.length} entrevistas`);
+            interview = await getInterviewById(id);
           } catch (retryErr) {
             console.error(`[ERROR] ❌ Retry também falhou:`, retryErr);
-            throw new Error(`Não foi possível carregar as entrevistas. Verifique se o backend está rodando em http://localhost:8000`);
-          }
-        } else {
-          // Tentar buscar sem positionId (pode ser que o endpoint seja diferente)
-          try {
-            console.log(`[DEBUG] 🔄 Tentando buscar sem positionId...`);
-            interviews = await getInterviews();
-            console.log(`[DEBUG] 📋 Total de entrevistas encontradas (fallback): ${interviews.length}`);
-            if (!Array.isArray(interviews)) {
-              console.error(`[ERROR] ❌ getInterviews (fallback) não retornou um array!`);
-              throw new Error('Resposta inválida do servidor');
+            if (!(retryErr.message && retryErr.message.includes('não encontrada'))) {
+              throw new Error(`Não foi possível carregar a entrevista. Verifique se o backend está rodando em http://localhost:8000`);
             }
-          } catch (err2) {
-            console.error(`[ERROR] ❌ Erro no fallback também:`, err2);
-            throw new Error(`Não foi possível carregar as entrevistas: ${err.message || err2.message}`);
           }
         }
       }
       
-      if (!interviews || interviews.length === 0) {
-        console.warn(`[WARNING] ⚠️ Nenhuma entrevista encontrada no servidor`);
-        // Não mostrar alert, apenas log - a página vai mostrar loading
-        console.log(`[DEBUG] ⏳ Aguardando entrevista ser criada...`);
-        setLoading(false);
-        // Criar dados vazios para mostrar a página
-        setInterviewData({
-          rawInterview: null,
-          candidate: {
-            candidateName: 'Carregando...',
-            candidateEmail: '',
-            candidatePhone: ''
-          },
-          date: 'Carregando...',
-          position: 'Carregando...',
-          skills: [],
-          history: [],
-          positives: [],
-          negatives: [],
-          specific: 'Aguardando processamento...',
-          notes: '',
-          transcription: [],
-          score: 0,
-          summary: '',
-          analysis: {},
-          audioFile: null,
-          hasAudio: false,
-          audioDuration: null
-        });
-        setIsProcessing(true);
-        return;
-      }
-      
-      const interview = interviews.find(i => i.id === parseInt(id));
-      
       if (!interview) {
         console.error(`[ERROR] ❌ Entrevista ${id} não encontrada!`);
-        console.log(`[DEBUG] IDs disponíveis:`, interviews.map(i => i.id));
         // Não mostrar alert, apenas criar dados vazios e continuar tentando
         console.log(`[DEBUG] ⏳ Entrevista ainda não existe, aguardando...`);
         setLoading(false);
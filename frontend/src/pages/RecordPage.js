@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
-import { generateAnalysis, updateInterviewNotes, getInterviewById, getGlobalQuestions } from '../services/api';
+import { streamAnalysis, extractPartialSummary, updateInterviewNotes, getInterviewById, getGlobalQuestions } from '../services/api';
 import { useRealtimeTranscription } from '../hooks/useRealtimeTranscription';
 import { InfoIcon, FileTextIcon, BriefcaseIcon } from '../components/icons';
 import './RecordPage.css';
@@ -42,6 +42,7 @@ function RecordPage() {
   // Estado de processamento
   const [isProcessing, setIsProcessing] = useState(false);
   const [processingMessage, setProcessingMessage] = useState('');
+  const [partialSummary, setPartialSummary] = useState('');
   
   // Ref para auto-scroll da transcrição
   const transcriptionContentRef = useRef(null);
@@ -455,7 +456,21 @@ function RecordPage() {
       console.log('[6/6] Gerando análise com IA...');
       setProcessingMessage('Gerando análise e resumo... (isso pode levar alguns minutos)');
       const startAnalysis = Date.now();
-      await generateAnalysis(interviewId);
+      const stageMessages = {
+        waiting_diarization: 'Aguardando identificação dos participantes...',
+        transcribing: 'Transcrevendo o áudio...',
+        summarizing_segments: 'Resumindo trechos da entrevista...',
+        prompting: 'Gerando análise e resumo...',
+        validating: 'Validando análise...',
+        saved: 'Análise salva!',
+        in_progress: 'Análise já em andamento, aguardando resultado...'
+      };
+      await streamAnalysis(interviewId, {
+        onStage: ({ stage }) => {
+          if (stageMessages[stage]) setProcessingMessage(stageMessages[stage]);
+        },
+        onToken: (partial) => setPartialSummary(extractPartialSummary(partial))
+      });
       const analysisTime = ((Date.now() - startAnalysis) / 1000).toFixed(2);
       console.log(`⏱️  [6/6] Análise gerada em ${analysisTime}s`);
       
@@ -647,6 +662,11 @@ function RecordPage() {
             <p style={{ margin: 0, fontSize: '1rem', color: '#374151' }}>
               {processingMessage || 'Processando entrevista...'}
             </p>
+            {partialSummary && (
+              <p style={{ margin: '1rem 0 0', fontSize: '0.875rem', color: '#6b7280', textAlign: 'left' }}>
+                {partialSummary}
+              </p>
+            )}
           </div>
         </div>
       )}
@@ -173,12 +173,60 @@ export const generateAnalysis = async (interviewId) => {
   }
 };
 
-export const getInterviews = async (positionId = 0, page = 1, perPage = 100) => {
+// Extrai o "summary" parcial do JSON que o LLM ainda está gerando
+export const extractPartialSummary = (partialJson) => {
+  const match = partialJson.match(/"summary"\s*:\s*"((?:[^"\\]|\\.)*)/);
+  if (!match) return '';
+  try {
+    return JSON.parse(`"${match[1].replace(/\\$/, '')}"`);
+  } catch {
+    return match[1];
+  }
+};
+
+// Gera a análise via Server-Sent Events: onStage recebe cada etapa e onToken o JSON parcial
+export const streamAnalysis = (interviewId, { onStage, onToken, force = false } = {}) => {
+  return new Promise((resolve, reject) => {
+    const url = `${API_BASE_URL}/positions/interviews/${interviewId}/process/analysis/stream${force ? '?force=true' : ''}`;
+    const source = new EventSource(url);
+    let partial = '';
+
+    const timeoutId = setTimeout(() => {
+      source.close();
+      reject(new Error('Timeout ao gerar análise. A análise pode estar demorando mais que o esperado.'));
+    }, 180000); // 3 minutos de timeout
+
+    const finish = () => {
+      clearTimeout(timeoutId);
+      source.close();
+    };
+
+    source.addEventListener('stage', (event) => {
+      onStage?.(JSON.parse(event.data));
+    });
+    source.addEventListener('token', (event) => {
+      partial += JSON.parse(event.data).delta;
+      onToken?.(partial);
+    });
+    source.addEventListener('done', (event) => {
+      finish();
+      resolve(JSON.parse(event.data));
+    });
+    source.addEventListener('error', (event) => {
+      finish();
+      // Evento "error" do servidor tem data; erro de conexão do EventSource não
+      const detail = event.data ? JSON.parse(event.data).detail : null;
+      reject(new Error(detail || 'Erro ao gerar análise'));
+    });
+  });
+};
+
+export const getInterviews = async (positionId = 0, page = 1, perPage = 100, view = 'full') => {
   const controller = new AbortController();
   const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 segundos de timeout (aumentado)
   
   try {
-    const response = await fetch(`${API_BASE_URL}/positions/interviews/${positionId}?page=${page}&per_page=${perPage}`, {
+    const response = await fetch(`${API_BASE_URL}/positions/interviews/${positionId}?page=${page}&per_page=${perPage}&view=${view}`, {
       signal: controller.signal
     });
     
@@ -218,15 +266,63 @@ export const getInterviews = async (positionId = 0, page = 1, perPage = 100) =>
   }
 };
 
-export const getInterviewById = async (interviewId) => {
-  const interviews = await getInterviews();
-  const interview = interviews.find(i => i.id === parseInt(interviewId));
+export const getInterviewDetail = async (interviewId) => {
+  const response = await fetch(`${API_BASE_URL}/positions/interviews/${interviewId}/detail`);
   
-  if (!interview) {
+  if (response.status === 404) {
     throw new Error('Entrevista não encontrada');
   }
+  if (!response.ok) {
+    throw new Error(`Erro ao buscar entrevista: ${response.status}`);
+  }
+  
+  return response.json();
+};
+
+export const searchInterviews = async (query, positionId = null, limit = 20) => {
+  const params = new URLSearchParams({ q: query, limit });
+  if (positionId) params.append('position_id', positionId);
+  const response = await fetch(`${API_BASE_URL}/positions/interviews/search?${params}`);
+
+  if (!response.ok) {
+    throw new Error(`Erro ao buscar entrevistas: ${response.status}`);
+  }
+
+  return response.json();
+};
+
+export const getInterviewTranscript = async (interviewId) => {
+  const response = await fetch(`${API_BASE_URL}/positions/interviews/${interviewId}/transcript`);
+  
+  if (!response.ok) {
+    throw new Error(`Erro ao buscar transcrição: ${response.status}`);
+  }
+  
+  const data = await response.json();
+  return data.transcript;
+};
+
+export const getInterviewAnalysis = async (interviewId) => {
+  const response = await fetch(`${API_BASE_URL}/positions/interviews/${interviewId}/analysis`);
+  
+  if (!response.ok) {
+    throw new Error(`Erro ao buscar análise: ${response.status}`);
+  }
+  
+  const data = await response.json();
+  return data.analysis;
+};
+
+export const getInterviewById = async (interviewId) => {
+  const detail = await getInterviewDetail(interviewId);
+  
+  // Transcrição e análise só são buscadas quando existem
+  const [transcript, analysis] = await Promise.all([
+    detail.has_transcript ? getInterviewTranscript(interviewId) : Promise.resolve(''),
+    detail.has_analysis ? getInterviewAnalysis(interviewId) : Promise.resolve('')
+  ]);
   
-  return interview;
+  return { ...detail, transcript, analysis };
 };
 
 export const deleteInterview = async (interviewId) => {